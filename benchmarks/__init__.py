@@ -0,0 +1,35 @@
+"""
+Benchmarks for the hot paths. Run them one module at a time from the repo
+root, e.g. `python -m benchmarks.serialization`. Gemini is faked and mail
+goes to a local aiosmtpd server; only `benchmarks.mongo` needs a server.
+"""
+
+from __future__ import annotations
+
+import os
+import timeit
+from typing import Any, Callable
+
+__all__ = ("best_of", "ms", "us")
+
+# src reads its configuration at import time
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MAIL", "preploop@example.com")
+os.environ.setdefault("PASS", "password")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+
+def best_of(func: Callable[[], Any], *, number: int = 100, repeat: int = 5) -> float:
+    """
+    Seconds per call of `func`, from the fastest of `repeat` runs of `number`
+    calls each.
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def ms(seconds: float) -> str:
+    return f"{seconds * 1000:.2f} ms"
+
+
+def us(seconds: float) -> str:
+    return f"{seconds * 1e6:.1f} us"
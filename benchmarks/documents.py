@@ -0,0 +1,63 @@
+"""
+Stored documents of realistic shape for the serialization benchmarks, in
+the JSON form the repositories read from Mongo.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from src.models import Interview, ScheduledInterview, User
+from src.models.question import Question
+
+__all__ = ("interview_documents", "user_document")
+
+_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _interview(i: int, questions: int) -> Interview:
+    return Interview(
+        subject="Operating systems",
+        topics=["scheduling", "memory", "file systems"],
+        questions=[
+            Question(
+                question=f"Question {j}: explain how the kernel handles this case?",
+                correct_answer="A paragraph long answer. " * 8,
+                user_answer="What the candidate said. " * 6,
+                accuracy=0.75,
+            )
+            for j in range(questions)
+        ],
+        start_date=_START + timedelta(days=i),
+        end_date=_START + timedelta(days=i, minutes=45),
+        overall_score=71.5,
+        eye_contact_percentage=64.0,
+        is_completed=True,
+    )
+
+
+def interview_documents(count: int, *, questions: int = 5) -> List[Dict[str, Any]]:
+    return [_interview(i, questions).model_dump(mode="json") for i in range(count)]
+
+
+def user_document(*, scheduled: int = 0) -> Dict[str, Any]:
+    """
+    A user as stored. History lives in its own collection, so there is none.
+    """
+    user = User(
+        first_name="Ada",
+        last_name="Lovelace",
+        email="ada@example.com",
+        password="$2b$12$" + "x" * 53,
+        scheduled_interviews=[
+            ScheduledInterview(
+                subject="Networks",
+                topics=["tcp", "routing"],
+                duration=45,
+                date=_START + timedelta(days=i),
+            )
+            for i in range(scheduled)
+        ],
+    )
+    return user.model_dump(mode="json", by_alias=True, exclude={"history"})
@@ -0,0 +1,72 @@
+"""
+Question generation against a fake Gemini that answers after `LATENCY`
+seconds. The blocking run stands in for the old synchronous client, which
+held the event loop for the whole call; the async client overlaps calls up
+to GEMINI_MAX_CONCURRENCY, and identical requests share a single call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from benchmarks import ms
+from src.utils import GoogleGenerativeAIHandler
+from tests.fakes import FakeClient, FakeModels
+
+LATENCY = 0.1
+REQUESTS = 32
+
+
+class BlockingModels(FakeModels):
+    def __init__(self, block: float):
+        super().__init__()
+        self.block = block
+
+    async def generate_content(self, **request: Any) -> SimpleNamespace:
+        time.sleep(self.block)
+        return await super().generate_content(**request)
+
+
+async def _loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Worst delay seen by a task that only wants to wake up every `interval`."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run(label: str, models: FakeModels, topic: Callable[[int], str]) -> None:
+    handler = GoogleGenerativeAIHandler()
+    handler.client = FakeClient(models)  # type: ignore[assignment]
+
+    stop = asyncio.Event()
+    lag = asyncio.ensure_future(_loop_lag(stop))
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(handler.generate_questions(5, topic(i)) for i in range(REQUESTS))
+    )
+    elapsed = time.perf_counter() - start
+    stop.set()
+
+    print(
+        f"{label:<24} {ms(elapsed):>12} {models.calls:>4} calls"
+        f"   worst loop lag {ms(await lag)}"
+    )
+
+
+async def main() -> None:
+    print(f"{REQUESTS} requests, {LATENCY * 1000:.0f} ms per model call")
+    await run("blocking, distinct", BlockingModels(LATENCY), lambda i: f"t{i}")
+    await run("async, distinct", FakeModels(delay=LATENCY), lambda i: f"t{i}")
+    await run("async, identical", FakeModels(delay=LATENCY), lambda i: "trees")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
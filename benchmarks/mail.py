@@ -0,0 +1,108 @@
+"""
+OTP mail against a local aiosmtpd server. The per-request run stands in
+for the old path, which opened, authenticated and closed a connection
+inside every /user/otp/generate call; with MailQueue the request only
+enqueues, and workers send over connections they keep open.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+from aiosmtplib import send
+
+from benchmarks import ms, us
+from src.mail import MailQueue, render_otp_email
+
+HOST = "127.0.0.1"
+PORT = 8025
+MESSAGES = 50
+
+# aiosmtpd logs a deprecation warning about its own API on every login
+logging.getLogger("mail.log").setLevel(logging.ERROR)
+
+
+class Sink:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server: Any, session: Any, envelope: Any) -> str:
+        self.received += 1
+        return "250 OK"
+
+
+def _accept(*args: Any) -> AuthResult:
+    return AuthResult(success=True)
+
+
+def message(i: int):
+    return render_otp_email(
+        sender="preploop@example.com", receiver=f"user{i}@example.com", otp=123456
+    )
+
+
+async def per_request() -> None:
+    start = time.perf_counter()
+    for i in range(MESSAGES):
+        await send(
+            message(i),
+            hostname=HOST,
+            port=PORT,
+            username="preploop@example.com",
+            password="password",
+            use_tls=False,
+        )
+    elapsed = time.perf_counter() - start
+    print(f"{'connection per request':<24} {ms(elapsed / MESSAGES):>10} per request")
+
+
+async def queued() -> None:
+    queue = MailQueue(
+        hostname=HOST,
+        port=PORT,
+        username="preploop@example.com",
+        password="password",
+        use_tls=False,
+    )
+    await queue.start()
+
+    start = time.perf_counter()
+    for i in range(MESSAGES):
+        queue.enqueue(lambda i=i: message(i))
+    enqueued = time.perf_counter() - start
+    await queue.stop()
+    drained = time.perf_counter() - start
+
+    print(
+        f"{'MailQueue':<24} {us(enqueued / MESSAGES):>10} per request"
+        f"   all sent after {ms(drained)}, {queue.stats()}"
+    )
+
+
+async def main() -> None:
+    sink = Sink()
+    controller = Controller(
+        sink,
+        hostname=HOST,
+        port=PORT,
+        authenticator=_accept,
+        auth_require_tls=False,
+    )
+    controller.start()
+    try:
+        print(f"{MESSAGES} OTP mails to {HOST}:{PORT}")
+        await per_request()
+        await queued()
+    finally:
+        controller.stop()
+
+    print(f"server received {sink.received} messages")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
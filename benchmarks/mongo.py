@@ -0,0 +1,80 @@
+"""
+User reads against the MongoDB server at MONGODB_URI, in a throwaway
+`PrepLoopBenchmark` database that is dropped afterwards. The threaded run
+stands in for Motor, which ran every operation on a thread pool; the
+native async client runs them on the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, List
+
+from pymongo import MongoClient
+from pymongo.errors import ServerSelectionTimeoutError
+
+from benchmarks import ms
+from src.app import URI, mongo_client
+from src.repository import UserRepository
+
+DATABASE = "PrepLoopBenchmark"
+USERS = 1000
+READS = 5000
+CONCURRENCY = 100
+
+
+async def run(label: str, read: Callable[[str], Awaitable[object]]) -> None:
+    latencies: List[float] = []
+    ids = iter([f"user-{i % USERS}" for i in range(READS)])
+
+    async def reader() -> None:
+        for _id in ids:
+            start = time.perf_counter()
+            await read(_id)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(reader() for _ in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(
+        f"{label:<16} {READS / elapsed:>8.0f} reads/s"
+        f"   p50 {ms(statistics.median(latencies))}"
+        f"   p99 {ms(latencies[int(len(latencies) * 0.99)])}"
+    )
+
+
+async def main() -> None:
+    users = UserRepository(mongo_client[DATABASE]["users"])
+    try:
+        await mongo_client.admin.command("ping")
+    except ServerSelectionTimeoutError:
+        sys.exit(f"No MongoDB server at {URI}; set MONGODB_URI")
+
+    sync_client: MongoClient[dict] = MongoClient(URI)
+    sync_users = sync_client[DATABASE]["users"]
+    try:
+        await users.collection.insert_many(
+            [
+                {"_id": f"user-{i}", "first_name": "Ada", "email": f"{i}@example.com"}
+                for i in range(USERS)
+            ]
+        )
+        print(f"{READS} reads by id, {CONCURRENCY} at a time")
+        await run(
+            "threaded",
+            lambda _id: asyncio.to_thread(sync_users.find_one, {"_id": _id}),
+        )
+        await run("native async", users.find_by_id)
+    finally:
+        await mongo_client.drop_database(DATABASE)
+        sync_client.close()
+        await mongo_client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+"""
+`?raw=true` reads against the validated ones, from documents as they come
+out of Mongo. Raw mode only skips pydantic: documents are decoded the same
+way either way and written straight out with orjson. Reports the time per
+body and the peak memory allocated while building one.
+"""
+
+from __future__ import annotations
+
+import tracemalloc
+from typing import Any, Callable
+
+import bson
+
+from benchmarks import best_of, ms
+from benchmarks.documents import interview_documents, user_document
+from src.models import Interview, User
+from src.repository import InterviewRepository
+from src.responses import model_response
+from src.routes.user import INTERVIEW_JSON, USER_JSON, InterviewPage
+
+
+class _Collection:
+    def with_options(self, codec_options: Any) -> "_Collection":
+        self.codec_options = codec_options
+        return self
+
+
+def peak(func: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def compare(label: str, validated: Callable[[], Any], raw: Callable[[], Any]) -> None:
+    times = [best_of(func, number=20, repeat=7) for func in (validated, raw)]
+    peaks = [peak(func) / 2**10 for func in (validated, raw)]
+    print(
+        f"{label:<34} {ms(times[0]):>10} / {peaks[0]:>6.0f} KiB"
+        f" -> {ms(times[1]):>10} / {peaks[1]:>6.0f} KiB"
+    )
+
+
+def main() -> None:
+    print("validated -> raw, as time per body / peak memory")
+    user = bson.decode(bson.encode(user_document(scheduled=1000)))
+    compare(
+        "user, 1000 scheduled interviews",
+        lambda: model_response(User.model_validate(user)),
+        lambda: USER_JSON.dumps_document(user),
+    )
+
+    repository = InterviewRepository(_Collection())  # type: ignore[arg-type]
+    options = repository.collection.codec_options
+    page = [
+        bson.decode(
+            bson.encode(
+                repository.to_document("user", Interview.model_validate(document))
+            ),
+            codec_options=options,
+        )
+        for document in interview_documents(100)
+    ]
+    compare(
+        "history page, 100 interviews",
+        lambda: model_response(
+            InterviewPage(items=repository.from_documents(page), next_cursor="c")
+        ),
+        lambda: INTERVIEW_JSON.dumps_page(page, "c"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Rendering response bodies. Before, /content/questions returned its model
+without a response_model, so FastAPI ran it through jsonable_encoder and
+JSONResponse, and user reads called model_dump_json. Both now go through
+model_response, a single pydantic-core call. Bodies are checked to match.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+from benchmarks import best_of, us
+from benchmarks.documents import user_document
+from src.models import User
+from src.responses import model_response
+from src.utils import _Response
+from tests.fakes import questions_json
+
+
+def compare(
+    label: str, before: Callable[[], Response], after: Callable[[], Response]
+) -> None:
+    assert bytes(before().body) == bytes(after().body)
+
+    old = best_of(before, number=200, repeat=7)
+    new = best_of(after, number=200, repeat=7)
+    print(f"{label:<32} {us(old):>10} -> {us(new):>10}   ({old / new:.1f}x)")
+
+
+def main() -> None:
+    questions = _Response.model_validate_json(questions_json(50))
+    compare(
+        "/content/questions, 50 questions",
+        lambda: JSONResponse(jsonable_encoder(questions)),
+        lambda: model_response(questions),
+    )
+
+    user = User.model_validate(user_document(scheduled=50))
+    compare(
+        "/user/fetch/{_id}, 50 scheduled",
+        lambda: Response(
+            user.model_dump_json(by_alias=True), media_type="application/json"
+        ),
+        lambda: model_response(user),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+/user/fetch/{_id} for users with 10, 100 and 1000 scheduled interviews.
+Validating and serializing the cached document on every read, as before,
+against the user cache's rendered body, which is built once per version
+and served as bytes on every later hit. The bodies are checked to match.
+"""
+
+from __future__ import annotations
+
+from benchmarks import best_of, ms, us
+from benchmarks.documents import user_document
+from src.models import User
+from src.responses import FastJSONResponse, model_response
+from src.routes.user import _render_user, users
+
+
+def every_read(document: dict) -> bytes:
+    return bytes(model_response(User.model_validate(document)).body)
+
+
+def cache_hit(document: dict) -> bytes:
+    return bytes(FastJSONResponse(users.render(document, _render_user)).body)
+
+
+def main() -> None:
+    for scheduled in (10, 100, 1000):
+        document = user_document(scheduled=scheduled)
+        assert every_read(document) == cache_hit(document)
+
+        number = max(5, 2000 // scheduled)
+        before = best_of(lambda: every_read(document), number=number, repeat=9)
+        after = best_of(lambda: cache_hit(document), number=number, repeat=9)
+        print(
+            f"{scheduled:>5} scheduled interviews   {ms(before):>10} -> {us(after):>10}"
+            f"   ({before / after:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
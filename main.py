@@ -1,23 +1,81 @@
 from __future__ import annotations
 
 import asyncio
+import copy
+import logging
 import os
+import random
+
+from dotenv import load_dotenv
+
+load_dotenv()
 
 if os.name == "nt":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-else:
-    try:
-        import uvloop
-
-        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
-    except ImportError:
-        pass
 
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", 8000))
 
+# Development mode: a single process with auto-reload and debug logging
+RELOAD = os.getenv("RELOAD", "false").lower() in ("1", "true", "yes")
+
+WORKERS = int(os.getenv("WORKERS", os.cpu_count() or 1))
+# In-memory OTPs are per process: a code sent by one worker would be unknown
+# to the others, so several workers need the shared Mongo store
+OTP_BACKEND = os.getenv("OTP_BACKEND", "mongo" if WORKERS > 1 else "memory")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+# Fraction of requests written to the access log; 0 turns it off
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", 0))
+# uvloop does not support Windows
+LOOP = os.getenv("LOOP", "asyncio" if os.name == "nt" else "uvloop")
+HTTP = os.getenv("HTTP", "httptools")
+
+
+class SampledAccessFilter(logging.Filter):
+    """Lets through roughly `rate` of the records it sees."""
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return self.rate >= 1 or random.random() < self.rate
+
+
+def _log_config() -> dict:
+    from uvicorn.config import LOGGING_CONFIG
+
+    config = copy.deepcopy(LOGGING_CONFIG)
+    config["filters"] = {
+        "sampled": {"()": SampledAccessFilter, "rate": ACCESS_LOG_SAMPLE_RATE}
+    }
+    config["handlers"]["access"]["filters"] = ["sampled"]
+    return config
+
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run("src:app", host=HOST, port=PORT, log_level="debug", reload=True)
+    if RELOAD:
+        uvicorn.run("src:app", host=HOST, port=PORT, log_level="debug", reload=True)
+    else:
+        if WORKERS > 1 and OTP_BACKEND == "memory":
+            raise SystemExit(
+                "OTP_BACKEND=memory does not work with more than one worker; "
+                "use OTP_BACKEND=mongo or WORKERS=1"
+            )
+        # Workers read it at import, so pass on the default chosen above
+        os.environ["OTP_BACKEND"] = OTP_BACKEND
+
+        uvicorn.run(
+            "src:app",
+            host=HOST,
+            port=PORT,
+            workers=WORKERS,
+            loop=LOOP,
+            http=HTTP,
+            log_level=LOG_LEVEL,
+            access_log=ACCESS_LOG_SAMPLE_RATE > 0,
+            log_config=_log_config(),
+            timeout_graceful_shutdown=int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", 20)),
+        )
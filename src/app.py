@@ -1,20 +1,99 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient
+
+from .indexes import IndexManager
+from .mongo_metrics import PoolMetrics
 
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
 URI = os.getenv("MONGODB_URI")
 
 if URI is None:
     raise ValueError("MONGODB_URI is not set")
 
-mongo_client = AsyncIOMotorClient(URI, document_class=dict)
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", 100))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", 10))
+MONGODB_MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", 300_000))
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(
+    os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", 5_000)
+)
+# Wire compression in order of preference; the server picks the first it supports
+MONGODB_COMPRESSORS = os.getenv("MONGODB_COMPRESSORS", "zstd,zlib")
+MONGODB_READ_PREFERENCE = os.getenv("MONGODB_READ_PREFERENCE", "primary")
+
+pool_metrics = PoolMetrics()
+
+mongo_client: AsyncMongoClient[dict] = AsyncMongoClient(
+    URI,
+    document_class=dict,
+    maxPoolSize=MONGODB_MAX_POOL_SIZE,
+    minPoolSize=MONGODB_MIN_POOL_SIZE,
+    maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
+    serverSelectionTimeoutMS=MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+    compressors=MONGODB_COMPRESSORS,
+    readPreference=MONGODB_READ_PREFERENCE,
+    event_listeners=[pool_metrics],
+)
+database = mongo_client["PrepLoop"]
+index_manager = IndexManager(database)
+
+Hook = Callable[[], Awaitable[None]]
+
+_startup_hooks: List[Hook] = []
+_shutdown_hooks: List[Hook] = []
+
+
+def on_startup(func: Hook) -> Hook:
+    """Register a coroutine to run when the app starts serving."""
+    _startup_hooks.append(func)
+    return func
+
+
+def on_shutdown(func: Hook) -> Hook:
+    """Register a coroutine to run when the app shuts down, in reverse order."""
+    _shutdown_hooks.append(func)
+    return func
+
+
+async def _warm_mongo_pool() -> None:
+    # The first ping resolves SRV records and discovers the topology; the
+    # concurrent ones then open up to minPoolSize connections
+    await mongo_client.admin.command("ping")
+    await asyncio.gather(
+        *(mongo_client.admin.command("ping") for _ in range(MONGODB_MIN_POOL_SIZE))
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    try:
+        await _warm_mongo_pool()
+    except Exception:
+        log.warning("MongoDB is unreachable, starting with a cold pool", exc_info=True)
+
+    index_manager.start()
+    for hook in _startup_hooks:
+        await hook()
+    try:
+        yield
+    finally:
+        for hook in reversed(_shutdown_hooks):
+            await hook()
+        await index_manager.stop()
+        await mongo_client.close()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 from .routes import *  # noqa: E402, F401, F403
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+from contextlib import suppress
+from time import monotonic
+from typing import Any, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+import lru
+
+__all__ = ("DecayedCounter", "TTLCache")
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Typed as Any so `entry is not _MISSING` leaves entries usable as tuples
+_MISSING: Any = object()
+
+
+class TTLCache(Generic[V]):
+    """
+    A bounded LRU cache whose entries also expire after a time-to-live.
+
+    Expired entries are dropped lazily on lookup and proactively by
+    :meth:`sweep`, which can be run periodically with :meth:`start_sweeper`.
+    """
+
+    def __init__(self, maxsize: int = 2**10, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Store (value, expires_at) for each key
+        self._data = lru.LRU(maxsize, callback=self._on_evict)
+        self._sweeper: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _on_evict(self, key: Hashable, entry: Any) -> None:
+        self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key, _MISSING)
+        return entry is not _MISSING and entry[1] > monotonic()
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        value, expires_at = entry
+        if expires_at <= monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V, *, ttl: Optional[float] = None) -> None:
+        self._data[key] = (value, monotonic() + (self.ttl if ttl is None else ttl))
+
+    def ttl_remaining(self, key: Hashable) -> Optional[float]:
+        """
+        Seconds until `key` expires, or None if it is not cached. Not counted
+        as a hit or miss.
+        """
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return None
+
+        remaining = entry[1] - monotonic()
+        return remaining if remaining > 0 else None
+
+    def pop(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        entry = self._data.pop(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        return entry[0]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def sweep(self) -> int:
+        """
+        Remove every expired entry. Returns the number of entries removed.
+        """
+        now = monotonic()
+        expired = [
+            key for key, (_, expires_at) in self._data.items() if expires_at <= now
+        ]
+        for key in expired:
+            with suppress(KeyError):
+                del self._data[key]
+
+        self.expirations += len(expired)
+        return len(expired)
+
+    async def _sweep_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    def start_sweeper(self, interval: float = 60.0) -> None:
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_forever(interval))
+
+    async def stop_sweeper(self) -> None:
+        if self._sweeper is None:
+            return
+
+        self._sweeper.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._sweeper
+        self._sweeper = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class DecayedCounter(Generic[K]):
+    """
+    Approximate request frequency per key. Every hit adds one to the key's
+    score, and scores halve every `half_life` seconds, so recent popularity
+    outweighs old popularity. At most `maxsize` keys are tracked; the coldest
+    are dropped first.
+    """
+
+    def __init__(self, *, half_life: float = 600.0, maxsize: int = 2**12):
+        self.half_life = half_life
+        self.maxsize = maxsize
+        # Store (score, updated_at) for each key
+        self._scores: Dict[K, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _decayed(self, score: float, updated_at: float, now: float) -> float:
+        return score * 0.5 ** ((now - updated_at) / self.half_life)
+
+    def hit(self, key: K, weight: float = 1.0) -> None:
+        now = monotonic()
+        score, updated_at = self._scores.get(key, (0.0, now))
+        self._scores[key] = (self._decayed(score, updated_at, now) + weight, now)
+
+        if len(self._scores) > self.maxsize:
+            self._prune(now)
+
+    def score(self, key: K) -> float:
+        entry = self._scores.get(key)
+        return 0.0 if entry is None else self._decayed(*entry, monotonic())
+
+    def top(self, k: int) -> List[Tuple[K, float]]:
+        now = monotonic()
+        return heapq.nlargest(
+            k,
+            ((key, self._decayed(*entry, now)) for key, entry in self._scores.items()),
+            key=lambda item: item[1],
+        )
+
+    def _prune(self, now: float) -> None:
+        keep = heapq.nlargest(
+            self.maxsize // 2,
+            self._scores.items(),
+            key=lambda item: self._decayed(*item[1], now),
+        )
+        self._scores = dict(keep)
@@ -0,0 +1,64 @@
+"""
+Writes documents read from Mongo as JSON with orjson, without validating
+them into models first. Decoding is unchanged, so this only saves the
+pydantic step. Meant for trusted reads of our own documents, which are
+stored in their JSON form already.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Collection, Dict, Iterable, List, Mapping, Optional
+
+import orjson
+from bson import ObjectId
+
+__all__ = ("DocumentWriter",)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class DocumentWriter:
+    """
+    Writes documents as JSON. `rename` and `exclude` apply to top-level keys
+    only, e.g. `rename={"_id": "id"}`. Datetimes come out as pydantic writes
+    them, UTC ones with a `Z`, and ObjectIds as strings. Any other type JSON
+    has no form for, such as bytes, raises `TypeError`.
+    """
+
+    def __init__(
+        self,
+        *,
+        rename: Optional[Mapping[str, str]] = None,
+        exclude: Collection[str] = (),
+    ):
+        self.rename = dict(rename or {})
+        self.exclude = frozenset(exclude)
+
+    def shape(self, document: Mapping[str, Any]) -> Dict[str, Any]:
+        return {
+            self.rename.get(key, key): value
+            for key, value in document.items()
+            if key not in self.exclude
+        }
+
+    def dumps_document(self, document: Mapping[str, Any]) -> bytes:
+        if self.rename or self.exclude:
+            document = self.shape(document)
+        return orjson.dumps(document, default=_default, option=orjson.OPT_UTC_Z)
+
+    def dumps_page(
+        self, documents: Iterable[Mapping[str, Any]], next_cursor: Optional[str]
+    ) -> bytes:
+        """
+        Writes `{"items": [...], "next_cursor": ...}`.
+        """
+        items: List[Dict[str, Any]] = [self.shape(document) for document in documents]
+        return orjson.dumps(
+            {"items": items, "next_cursor": next_cursor},
+            default=_default,
+            option=orjson.OPT_UTC_Z,
+        )
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import suppress
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+if TYPE_CHECKING:
+    from pymongo.asynchronous.database import AsyncDatabase
+
+__all__ = ("INDEXES", "IndexManager")
+
+log = logging.getLogger(__name__)
+
+# Every index the app relies on, per collection
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "questions": [
+        IndexModel([("topic", ASCENDING)], name="topic"),
+    ],
+    "interviews": [
+        IndexModel(
+            [("user_id", ASCENDING), ("start_date", DESCENDING), ("_id", DESCENDING)],
+            name="user_id_start_date",
+        ),
+    ],
+    "otps": [
+        IndexModel(
+            [("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0
+        ),
+    ],
+}
+
+
+class IndexManager:
+    """
+    Creates the declared indexes in the background at startup. Creating an
+    index that already exists with the same options is a no-op, so this is
+    safe to run on every boot and from every worker. Until :meth:`is_ready`
+    confirms an index, code relying on it must not assume it is enforced.
+    """
+
+    def __init__(
+        self, database: AsyncDatabase, indexes: Dict[str, List[IndexModel]] = INDEXES
+    ):
+        self.database = database
+        self.indexes = indexes
+        self._task: Optional[asyncio.Task] = None
+        # Names of the indexes known to exist
+        self._ready: Set[str] = set()
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._ready
+
+    async def ensure(self) -> None:
+        for name, models in self.indexes.items():
+            try:
+                self._ready.update(await self.database[name].create_indexes(models))
+            except Exception:
+                log.exception("Failed to create indexes on %s", name)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.ensure())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
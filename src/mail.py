@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import suppress
+from email.message import EmailMessage
+from string import Template
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from aiosmtplib import SMTP, SMTPException
+
+__all__ = ("MailQueue", "MailQueueFull", "render_otp_email")
+
+log = logging.getLogger(__name__)
+
+# A message, or a callable building one so rendering happens off the request path
+Outgoing = Union[EmailMessage, Callable[[], EmailMessage]]
+
+# Rendered once at import; per message only the code is substituted
+_OTP_TEMPLATE = Template("""
+    <!DOCTYPE html>
+    <html>
+    <body style="margin:0; padding:0; background-color:#f2f6ff; font-family: Arial, sans-serif;">
+        
+        <div style="max-width:600px; margin:40px auto; background:white; padding:30px; border-radius:12px;">
+            
+            <!-- Branding -->
+            <h1 style="text-align:center; color:#2563eb; margin-bottom:5px;">
+                PrepLoop
+            </h1>
+            <p style="text-align:center; color:#6b7280; margin-top:0;">
+                Smart Interview Preparation
+            </p>
+
+            <!-- Title -->
+            <h2 style="text-align:center; color:#111827;">
+                Verify Your Email
+            </h2>
+
+            <!-- Message -->
+            <p style="text-align:center; color:#374151; font-size:16px;">
+                Use the OTP below to continue with <b>PrepLoop</b>.
+            </p>
+
+            <!-- OTP Box -->
+            <div style="text-align:center; margin:30px 0;">
+                <span style="
+                    display:inline-block;
+                    background:#2563eb;
+                    color:white;
+                    font-size:30px;
+                    letter-spacing:10px;
+                    padding:15px 30px;
+                    border-radius:10px;
+                    font-weight:bold;
+                ">
+                    $otp
+                </span>
+            </div>
+
+            <!-- Info -->
+            <p style="text-align:center; color:#6b7280; font-size:14px;">
+                This OTP is valid for <b>$minutes minutes</b>.
+            </p>
+
+            <p style="text-align:center; color:#9ca3af; font-size:12px;">
+                Do not share this code with anyone.
+            </p>
+
+            <hr style="margin:25px 0; border:none; border-top:1px solid #e5e7eb;">
+
+            <!-- Footer -->
+            <p style="text-align:center; font-size:12px; color:#9ca3af;">
+                Didn’t request this? You can safely ignore this email.
+            </p>
+
+            <p style="text-align:center; font-size:12px; color:#d1d5db;">
+                © 2026 PrepLoop. All rights reserved.
+            </p>
+
+        </div>
+
+    </body>
+    </html>
+""")
+
+
+def render_otp_email(
+    *, sender: str, receiver: str, otp: int, valid_minutes: int = 5
+) -> EmailMessage:
+    message = EmailMessage()
+
+    message["From"] = f"PrepLoop <{sender}>"
+    message["To"] = receiver
+    message["Subject"] = "PrepLoop Verification Code 🔐"
+    message.add_alternative(
+        _OTP_TEMPLATE.substitute(otp=otp, minutes=valid_minutes), subtype="html"
+    )
+
+    return message
+
+
+class MailQueueFull(Exception):
+    """Raised when the outbound queue cannot take another message."""
+
+
+class MailQueue:
+    """
+    Outbound mail sent in the background. Messages are put on a bounded queue
+    and drained by `workers` tasks, each holding one long-lived authenticated
+    SMTP connection. Idle connections are kept alive with NOOP and re-opened
+    when the server drops them.
+    """
+
+    def __init__(
+        self,
+        *,
+        hostname: str,
+        port: int,
+        username: str,
+        password: str,
+        use_tls: bool = True,
+        workers: int = 2,
+        maxsize: int = 1000,
+        keepalive: float = 60.0,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.workers = workers
+        self.keepalive = keepalive
+
+        self._queue: asyncio.Queue[Outgoing] = asyncio.Queue(maxsize)
+        self._tasks: List[asyncio.Task] = []
+
+        self.sent = 0
+        self.failed = 0
+        self.reconnects = 0
+
+    def enqueue(self, message: Outgoing) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            raise MailQueueFull("Outbound mail queue is full") from None
+
+    async def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker()) for _ in range(self.workers)
+            ]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Give queued messages up to `timeout` seconds to go out, then stop the
+        workers and close their connections.
+        """
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._queue.join(), timeout)
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _connect(self) -> SMTP:
+        smtp = SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            use_tls=self.use_tls,
+        )
+        await smtp.connect()
+        return smtp
+
+    @staticmethod
+    async def _close(smtp: Optional[SMTP]) -> None:
+        if smtp is None:
+            return
+        try:
+            await smtp.quit()
+        except (SMTPException, OSError):
+            smtp.close()
+
+    async def _send(
+        self, smtp: Optional[SMTP], message: EmailMessage
+    ) -> Optional[SMTP]:
+        # One reconnect covers a connection the server closed while idle
+        for attempt in range(2):
+            try:
+                if smtp is None or not smtp.is_connected:
+                    if attempt or smtp is not None:
+                        self.reconnects += 1
+                    smtp = await self._connect()
+                await smtp.send_message(message)
+            except (SMTPException, OSError):
+                await self._close(smtp)
+                smtp = None
+                if attempt:
+                    self.failed += 1
+                    log.exception("Failed to send mail to %s", message["To"])
+            else:
+                self.sent += 1
+                break
+
+        return smtp
+
+    async def _worker(self) -> None:
+        smtp: Optional[SMTP] = None
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(self._queue.get(), self.keepalive)
+                except asyncio.TimeoutError:
+                    if smtp is not None:
+                        try:
+                            await smtp.noop()
+                        except (SMTPException, OSError):
+                            await self._close(smtp)
+                            smtp = None
+                    continue
+
+                try:
+                    if callable(message):
+                        message = message()
+                    smtp = await self._send(smtp, message)
+                except Exception:
+                    log.exception("Failed to prepare outbound mail")
+                finally:
+                    self._queue.task_done()
+        finally:
+            await self._close(smtp)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "reconnects": self.reconnects,
+        }
@@ -0,0 +1,72 @@
+"""
+Moves interview history embedded in `users` documents into the `interviews`
+collection. Safe to run while the app is serving and to re-run: users are
+streamed one at a time, interviews are upserted by id, and only the
+interviews that were copied are pulled from the user document.
+
+    python -m src.migrations [--batch-size N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from .models import Interview
+from .repository import InterviewRepository
+
+if TYPE_CHECKING:
+    from pymongo.asynchronous.database import AsyncDatabase
+
+__all__ = ("migrate_history",)
+
+log = logging.getLogger(__name__)
+
+
+async def migrate_history(database: AsyncDatabase, *, batch_size: int = 100) -> int:
+    """
+    Returns the number of interviews moved.
+    """
+    users = database["users"]
+    interviews = InterviewRepository(database["interviews"])
+
+    moved = 0
+    cursor = users.find(
+        {"history.0": {"$exists": True}},
+        projection={"history": 1},
+        batch_size=batch_size,
+    )
+    async for document in cursor:
+        history = [Interview.model_validate(item) for item in document["history"]]
+        await interviews.upsert_many(document["_id"], history)
+        await users.update_one(
+            {"_id": document["_id"]},
+            {"$pull": {"history": {"id": {"$in": [str(i.id) for i in history]}}}},
+        )
+
+        moved += len(history)
+        log.info("Moved %d interviews of user %s", len(history), document["_id"])
+
+    return moved
+
+
+async def _main() -> None:
+    from .app import database, mongo_client
+
+    parser = argparse.ArgumentParser(description=(__doc__ or "").split("\n\n")[0])
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    try:
+        moved = await migrate_history(database, batch_size=args.batch_size)
+    finally:
+        await mongo_client.close()
+
+    print(f"Moved {moved} interviews")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
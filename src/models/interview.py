@@ -9,7 +9,7 @@ from pydantic import BaseModel, Field
 from .enums import InterviewFlag
 from .question import Question
 
-__all__ = ("Interview",)
+__all__ = ("Interview", "ScheduledInterview")
 
 
 class ScheduledInterview(BaseModel):
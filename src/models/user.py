@@ -21,3 +21,5 @@ class User(BaseModel):
     history: List[Interview] = []
     scheduled_interviews: List[ScheduledInterview] = []
     learning_days: List = []
+    # Bumped on every write, for optimistic concurrency
+    version: int = 0
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from pymongo import monitoring
+
+from .resilience import LatencyTracker
+
+__all__ = ("PoolMetrics",)
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool counters collected from driver events, most importantly
+    how long operations wait to check out a connection.
+    """
+
+    def __init__(self):
+        self.connections_open = 0
+        self.connections_in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.pool_clears = 0
+        self._checkout_wait = LatencyTracker(window=1000, min_samples=1)
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        self.pool_clears += 1
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        self.connections_open += 1
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        self.connections_open -= 1
+
+    def connection_check_out_started(
+        self, event: monitoring.ConnectionCheckOutStartedEvent
+    ) -> None:
+        pass
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ) -> None:
+        self.checkout_failures += 1
+
+    def connection_checked_out(
+        self, event: monitoring.ConnectionCheckedOutEvent
+    ) -> None:
+        self.checkouts += 1
+        self.connections_in_use += 1
+
+        wait = event.duration or 0.0
+        self.checkout_wait_total += wait
+        self.checkout_wait_max = max(self.checkout_wait_max, wait)
+        self._checkout_wait.record(wait)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        self.connections_in_use -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections_open": self.connections_open,
+            "connections_in_use": self.connections_in_use,
+            "checkouts": self.checkouts,
+            "checkout_failures": self.checkout_failures,
+            "checkout_wait_avg": (
+                self.checkout_wait_total / self.checkouts if self.checkouts else 0.0
+            ),
+            "checkout_wait_p95": self._checkout_wait.percentile(0.95),
+            "checkout_wait_max": self.checkout_wait_max,
+            "pool_clears": self.pool_clears,
+        }
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import heapq
+import secrets
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from time import monotonic
+from typing import TYPE_CHECKING, List, Tuple
+
+import lru
+from pymongo.errors import DuplicateKeyError
+
+if TYPE_CHECKING:
+    from pymongo.asynchronous.collection import AsyncCollection
+
+__all__ = ("BaseOTPHandler", "MongoOTPHandler", "OTPHandler", "OTPThrottled")
+
+
+class OTPThrottled(Exception):
+    """Raised when a new code is requested too soon after the previous one."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Retry after {retry_after:.0f} seconds")
+        self.retry_after = retry_after
+
+
+class BaseOTPHandler(ABC):
+    """
+    Issues one-time codes per email. A code expires after `ttl` seconds, is
+    consumed by the first successful validation and is locked after
+    `max_attempts` wrong guesses. A new code for the same email can only be
+    requested every `min_interval` seconds.
+    """
+
+    def __init__(
+        self, *, ttl: float = 300.0, max_attempts: int = 5, min_interval: float = 30.0
+    ):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self.min_interval = min_interval
+
+    def _generate_otp(self) -> int:
+        return 100_000 + secrets.randbelow(900_000)
+
+    @abstractmethod
+    async def generate_otp(self, *, email: str) -> int: ...
+
+    @abstractmethod
+    async def validate_otp(self, *, email: str, otp: int) -> bool: ...
+
+    @abstractmethod
+    async def revoke_otp(self, *, email: str, otp: int) -> None:
+        """
+        Withdraw a code that was never delivered, so that asking again is not
+        throttled. Does nothing if `otp` is no longer the current code.
+        """
+
+
+class OTPHandler(BaseOTPHandler):
+    """
+    Per-process store. Expiry is driven by a min-heap of deadlines, so stale
+    codes are dropped in order without scanning every entry.
+    """
+
+    def __init__(self, cache_size: int = 2**10, **kwargs):
+        super().__init__(**kwargs)
+        self.cache_size = cache_size
+        # Store [otp, expires_at, attempts, issued_at] for each email; a locked
+        # code keeps its entry with otp set to None until it expires
+        self.lru = lru.LRU(self.cache_size)
+        self._deadlines: List[Tuple[float, str]] = []
+
+    def _expire(self, now: float) -> None:
+        while self._deadlines and self._deadlines[0][0] <= now:
+            expires_at, email = heapq.heappop(self._deadlines)
+            entry = self.lru.get(email)
+            # Skip deadlines superseded by a newer code for the same email
+            if entry is not None and entry[1] == expires_at:
+                del self.lru[email]
+
+    async def generate_otp(self, *, email: str) -> int:
+        now = monotonic()
+        self._expire(now)
+
+        entry = self.lru.get(email)
+        if entry is not None and now - entry[3] < self.min_interval:
+            raise OTPThrottled(self.min_interval - (now - entry[3]))
+
+        otp = self._generate_otp()
+        expires_at = now + self.ttl
+        self.lru[email] = [otp, expires_at, 0, now]
+        heapq.heappush(self._deadlines, (expires_at, email))
+        return otp
+
+    async def validate_otp(self, *, email: str, otp: int) -> bool:
+        self._expire(monotonic())
+
+        entry = self.lru.get(email)
+        if entry is None or entry[0] is None:
+            return False
+
+        if entry[0] == otp:
+            del self.lru[email]
+            return True
+
+        entry[2] += 1
+        if entry[2] >= self.max_attempts:
+            entry[0] = None
+        return False
+
+    async def revoke_otp(self, *, email: str, otp: int) -> None:
+        entry = self.lru.get(email)
+        if entry is not None and entry[0] == otp:
+            del self.lru[email]
+
+
+class MongoOTPHandler(BaseOTPHandler):
+    """
+    Store shared by every worker and node, one document per email. The TTL
+    index on `expires_at` removes expired documents; queries check it too
+    since MongoDB's TTL monitor only runs about once a minute.
+    """
+
+    def __init__(self, collection: AsyncCollection, **kwargs):
+        super().__init__(**kwargs)
+        self.collection = collection
+
+    async def generate_otp(self, *, email: str) -> int:
+        now = datetime.now(timezone.utc)
+        otp = self._generate_otp()
+        try:
+            # Matches only when no code was issued within `min_interval`; a
+            # recent document makes the upsert collide on _id instead
+            await self.collection.update_one(
+                {
+                    "_id": email,
+                    "issued_at": {"$lte": now - timedelta(seconds=self.min_interval)},
+                },
+                {
+                    "$set": {
+                        "otp": otp,
+                        "attempts": 0,
+                        "issued_at": now,
+                        "expires_at": now + timedelta(seconds=self.ttl),
+                    }
+                },
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            raise OTPThrottled(self.min_interval) from None
+
+        return otp
+
+    async def validate_otp(self, *, email: str, otp: int) -> bool:
+        now = datetime.now(timezone.utc)
+        consumed = await self.collection.find_one_and_delete(
+            {
+                "_id": email,
+                "otp": otp,
+                "attempts": {"$lt": self.max_attempts},
+                "expires_at": {"$gt": now},
+            },
+            projection={"_id": 1},
+        )
+        if consumed is not None:
+            return True
+
+        await self.collection.update_one({"_id": email}, {"$inc": {"attempts": 1}})
+        return False
+
+    async def revoke_otp(self, *, email: str, otp: int) -> None:
+        await self.collection.delete_one({"_id": email, "otp": otp})
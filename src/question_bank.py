@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+from pymongo.errors import BulkWriteError
+
+from .cache import TTLCache
+from .utils import _Question, normalize_topic
+
+if TYPE_CHECKING:
+    from pymongo.asynchronous.collection import AsyncCollection
+
+__all__ = ("QuestionBank",)
+
+
+class QuestionBank:
+    """
+    Generated questions persisted in MongoDB, one document per question,
+    tagged with the normalized topic it was generated for.
+    """
+
+    def __init__(self, collection: AsyncCollection, *, count_ttl: float = 60.0):
+        self.collection = collection
+        # Per-topic sizes, refreshed at most once per `count_ttl` seconds
+        self._counts: TTLCache[int] = TTLCache(maxsize=2**12, ttl=count_ttl)
+
+    @staticmethod
+    def _question_id(topic: str, question: str) -> str:
+        text = " ".join(question.split()).casefold()
+        return hashlib.sha1(f"{topic}\0{text}".encode()).hexdigest()
+
+    async def counts(self, topics: Iterable[str]) -> Dict[str, int]:
+        topics = {normalize_topic(topic) for topic in topics}
+        counts = {topic: self._counts.get(topic) for topic in topics}
+        missing = [topic for topic, count in counts.items() if count is None]
+
+        if missing:
+            cursor = await self.collection.aggregate(
+                [
+                    {"$match": {"topic": {"$in": missing}}},
+                    {"$group": {"_id": "$topic", "count": {"$sum": 1}}},
+                ]
+            )
+            found = {doc["_id"]: doc["count"] async for doc in cursor}
+            for topic in missing:
+                count = counts[topic] = found.get(topic, 0)
+                self._counts.set(topic, count)
+
+        return counts  # type: ignore[return-value]
+
+    @staticmethod
+    def quotas(topics: Iterable[str], size: int) -> Dict[str, int]:
+        """
+        How many of `size` questions each topic contributes: an even share,
+        with the remainder going to the first topics in sorted order.
+        """
+        unique = sorted({normalize_topic(topic) for topic in topics})
+        share, extra = divmod(size, len(unique)) if unique else (0, 0)
+        return {topic: share + (i < extra) for i, topic in enumerate(unique)}
+
+    async def _sample_topic(self, topic: str, size: int) -> List[_Question]:
+        cursor = await self.collection.aggregate(
+            [
+                {"$match": {"topic": topic}},
+                {"$sample": {"size": size}},
+                {"$project": {"_id": 0, "question": 1, "correct_answer": 1}},
+            ]
+        )
+        return [_Question.model_validate(doc) async for doc in cursor]
+
+    async def sample(self, topics: Iterable[str], size: int) -> List[_Question]:
+        """
+        Draw up to `size` random questions, split evenly across `topics` (see
+        :meth:`quotas`) and shuffled together. Every call returns a fresh
+        random selection, so users asking for the same topics see different
+        sets.
+        """
+        quotas = {t: n for t, n in self.quotas(topics, size).items() if n > 0}
+        samples = await asyncio.gather(
+            *(self._sample_topic(topic, n) for topic, n in quotas.items())
+        )
+        questions = [question for sample in samples for question in sample]
+        random.shuffle(questions)
+        return questions
+
+    async def add(self, topic: str, questions: Iterable[_Question]) -> int:
+        """
+        Store questions under `topic`, skipping ones already in the bank.
+        Returns the number of newly stored questions.
+        """
+        topic = normalize_topic(topic)
+        documents = [
+            {
+                "_id": self._question_id(topic, question.question),
+                "topic": topic,
+                "question": question.question,
+                "correct_answer": question.correct_answer,
+            }
+            for question in questions
+        ]
+        if not documents:
+            return 0
+
+        try:
+            result = await self.collection.insert_many(documents, ordered=False)
+            inserted = len(result.inserted_ids)
+        except BulkWriteError as e:
+            # Duplicates are expected; everything else was still inserted
+            inserted = e.details.get("nInserted", 0)
+
+        self._counts.pop(topic)
+        return inserted
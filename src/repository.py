@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime, timezone
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from bson.codec_options import CodecOptions
+from pydantic import TypeAdapter
+from pymongo import DESCENDING, ReplaceOne, ReturnDocument
+
+from .models import Interview
+
+if TYPE_CHECKING:
+    from pymongo.asynchronous.collection import AsyncCollection
+    from pymongo.results import BulkWriteResult, DeleteResult, InsertOneResult
+
+__all__ = ("InterviewRepository", "UserRepository")
+
+Document = Dict[str, Any]
+
+# Interview history lives in its own collection, see InterviewRepository
+WITHOUT_HISTORY = {"history": 0}
+
+# Builds a whole page of interviews in one call into pydantic-core
+_INTERVIEWS = TypeAdapter(List[Interview])
+
+
+def _projection(fields: Optional[Collection[str]]) -> Document:
+    if not fields:
+        return WITHOUT_HISTORY
+
+    # `_id` keeps the projection non-empty when only `history` was asked
+    # for; an empty one would return the whole document
+    return {"_id": 1, **{field: 1 for field in fields if field != "history"}}
+
+
+class UserRepository:
+    """
+    Data access for the `users` collection. Documents are stored in the JSON
+    form of `User`, with the id under `_id`. Reads leave out any `history`
+    still embedded from before it moved to the `interviews` collection.
+    """
+
+    def __init__(self, collection: AsyncCollection[Document]):
+        self.collection = collection
+
+    async def find_by_id(
+        self, _id: str, *, fields: Optional[Collection[str]] = None
+    ) -> Optional[Document]:
+        """
+        With `fields`, only those top-level fields (and `_id`) are returned.
+        """
+        return await self.collection.find_one({"_id": _id}, _projection(fields))
+
+    async def find_many(
+        self,
+        ids: Iterable[str],
+        *,
+        fields: Optional[Collection[str]] = None,
+        chunk_size: int = 100,
+    ) -> AsyncIterator[List[Document]]:
+        """
+        Yields the users found for each chunk of `chunk_size` ids, one `$in`
+        query per chunk, so only one chunk is held in memory at a time.
+        """
+        ids = list(ids)
+        projection = _projection(fields)
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start : start + chunk_size]
+            cursor = self.collection.find({"_id": {"$in": chunk}}, projection)
+            yield await cursor.to_list()
+
+    async def find_by_email(self, email: str) -> Optional[Document]:
+        return await self.collection.find_one({"email": email}, WITHOUT_HISTORY)
+
+    async def find_by_credentials(
+        self, *, email: str, password: str, fields: Optional[Collection[str]] = None
+    ) -> Optional[Document]:
+        return await self.collection.find_one(
+            {"email": email, "password": password}, _projection(fields)
+        )
+
+    async def find_version(self, _id: str) -> Optional[int]:
+        """
+        The user's version, or None if there is no such user.
+        """
+        user = await self.collection.find_one({"_id": _id}, {"version": 1})
+        return None if user is None else user.get("version", 0)
+
+    async def exists(self, _id: str, *, where: Optional[Document] = None) -> bool:
+        query = {"_id": _id, **(where or {})}
+        return await self.collection.count_documents(query, limit=1) > 0
+
+    async def insert(self, document: Document) -> InsertOneResult:
+        """
+        Raises `DuplicateKeyError` if the id or email is already taken.
+        """
+        return await self.collection.insert_one(document)
+
+    async def modify(
+        self,
+        _id: str,
+        update: Document,
+        *,
+        version: Optional[int] = None,
+        where: Optional[Document] = None,
+        array_filters: Optional[List[Document]] = None,
+    ) -> Optional[Document]:
+        """
+        Applies `update` and bumps the version in one round trip, returning
+        the updated user. Returns None if no user with this id matches
+        `where`, or if `version` is given and is not the stored version.
+        """
+        query: Document = {"_id": _id, **(where or {})}
+        if version is not None:
+            # Users written before versioning have no version field
+            query["version"] = {"$in": [0, None]} if version == 0 else version
+
+        return await self.collection.find_one_and_update(
+            query,
+            {**update, "$inc": {"version": 1}},
+            projection=WITHOUT_HISTORY,
+            array_filters=array_filters,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def delete(self, _id: str) -> DeleteResult:
+        return await self.collection.delete_one({"_id": _id})
+
+
+class InterviewRepository:
+    """
+    Data access for the `interviews` collection: one document per `Interview`,
+    keyed by its id and tagged with the owning `user_id`. Dates are stored as
+    BSON dates so history can be range-queried by `start_date`; they are
+    read back as UTC, to the millisecond.
+    """
+
+    def __init__(self, collection: AsyncCollection[Document]):
+        self.collection = collection.with_options(
+            codec_options=CodecOptions(tz_aware=True, tzinfo=timezone.utc)
+        )
+
+    @staticmethod
+    def to_document(user_id: str, interview: Interview) -> Document:
+        document = interview.model_dump(mode="json")
+        document["_id"] = document.pop("id")
+        document["user_id"] = user_id
+        document["start_date"] = interview.start_date
+        document["end_date"] = interview.end_date
+        return document
+
+    @staticmethod
+    def _rename(document: Document) -> Document:
+        document = dict(document)
+        document["id"] = document.pop("_id")
+        document.pop("user_id", None)
+        return document
+
+    @classmethod
+    def from_document(cls, document: Document) -> Interview:
+        return Interview.model_validate(cls._rename(document))
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Document]) -> List[Interview]:
+        return _INTERVIEWS.validate_python([cls._rename(d) for d in documents])
+
+    @staticmethod
+    def _encode_cursor(document: Document) -> str:
+        position = [document["start_date"].isoformat(), document["_id"]]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+        """
+        Raises `ValueError` if the cursor is malformed.
+        """
+        try:
+            start_date, _id = json.loads(base64.urlsafe_b64decode(cursor))
+            return datetime.fromisoformat(start_date), str(_id)
+        except (TypeError, ValueError) as e:
+            raise ValueError("Invalid cursor") from e
+
+    async def page_for_user(
+        self, user_id: str, *, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Interview], Optional[str]]:
+        """
+        Returns up to `limit` interviews, newest first, starting after
+        `cursor`, and the cursor for the next page (None on the last page).
+        Pages are ranges on the (user_id, start_date, _id) index, so deep
+        pages cost the same as the first one.
+        """
+        documents, next_cursor = await self.page_documents_for_user(
+            user_id, limit=limit, cursor=cursor
+        )
+        return self.from_documents(documents), next_cursor
+
+    async def page_documents_for_user(
+        self, user_id: str, *, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Document], Optional[str]]:
+        """
+        Same as :meth:`page_for_user`, but returns the stored documents.
+        """
+        query: Document = {"user_id": user_id}
+        if cursor is not None:
+            start_date, _id = self._decode_cursor(cursor)
+            query["$or"] = [
+                {"start_date": {"$lt": start_date}},
+                {"start_date": start_date, "_id": {"$lt": _id}},
+            ]
+
+        documents = (
+            await self.collection.find(query)
+            .sort([("start_date", DESCENDING), ("_id", DESCENDING)])
+            .limit(limit + 1)
+            .to_list()
+        )
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = self._encode_cursor(documents[-1])
+
+        return documents, next_cursor
+
+    async def upsert_many(
+        self, user_id: str, interviews: Iterable[Interview]
+    ) -> Optional[BulkWriteResult]:
+        operations = [
+            ReplaceOne(
+                {"_id": str(interview.id)},
+                self.to_document(user_id, interview),
+                upsert=True,
+            )
+            for interview in interviews
+        ]
+        if not operations:
+            return None
+
+        return await self.collection.bulk_write(operations, ordered=False)
+
+    async def insert(self, user_id: str, interview: Interview) -> InsertOneResult:
+        """
+        Raises `DuplicateKeyError` if the interview id is already taken.
+        """
+        return await self.collection.insert_one(self.to_document(user_id, interview))
+
+    async def delete_for_user(self, user_id: str) -> DeleteResult:
+        return await self.collection.delete_many({"user_id": user_id})
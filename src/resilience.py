@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from collections import deque
+from time import monotonic
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+__all__ = ("CircuitBreaker", "CircuitOpenError", "LatencyTracker", "ResilientCaller")
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures. Once `reset_timeout`
+    seconds have passed a single trial call is let through: success closes
+    the circuit again, failure re-opens it. A trial that ends without an
+    answer either way must be given back with :meth:`release`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, *, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+
+        if (
+            self.state == self.OPEN
+            and monotonic() - self.opened_at >= self.reset_timeout
+        ):
+            self.state = self.HALF_OPEN
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def release(self) -> None:
+        """
+        Give back a trial call that neither succeeded nor failed, e.g. one that
+        was cancelled, so the next call can be the trial instead.
+        """
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+        }
+
+
+class LatencyTracker:
+    """Sliding window of recent call durations."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        The `q` quantile (0 < q < 1) of the window, or None until enough calls
+        have been observed.
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ResilientCaller:
+    """
+    Runs upstream calls with a per-attempt deadline, bounded retries with
+    full-jitter exponential backoff, optional hedging and a circuit breaker.
+
+    A hedged call starts a duplicate attempt once the first one has been
+    running longer than the recent p95 latency, and takes whichever finishes
+    first. Only exceptions accepted by `retryable` are retried or counted
+    against the circuit.
+
+    With a `limiter`, every upstream attempt holds one of its slots until it
+    ends, hedges included, and none is held during backoff. Waiting for a
+    slot does not count against the deadline, and a hedge only starts if a
+    slot is free.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float = 30.0,
+        retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge: bool = False,
+        breaker: Optional[CircuitBreaker] = None,
+        retryable: Callable[[BaseException], bool] = lambda exc: True,
+        limiter: Optional[asyncio.Semaphore] = None,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker()
+        self.retryable = retryable
+        self.limiter = limiter
+        self.latency = LatencyTracker()
+
+        self.retried = 0
+        self.hedged = 0
+        self.timeouts = 0
+
+    async def call(self, factory: Callable[[], Awaitable[T]]) -> T:
+        if not self.breaker.allow():
+            raise CircuitOpenError("Upstream is unhealthy, failing fast")
+
+        settled = False
+        attempt = 0
+        try:
+            while True:
+                try:
+                    result = await self._attempt(factory)
+                except Exception as exc:
+                    if not self.retryable(exc):
+                        # Upstream answered, the request itself was wrong
+                        self.breaker.record_success()
+                        settled = True
+                        raise
+                    if attempt >= self.retries:
+                        self.breaker.record_failure()
+                        settled = True
+                        raise
+
+                    delay = min(self.backoff_max, self.backoff_base * 2**attempt)
+                    await asyncio.sleep(random.uniform(0, delay))
+                    attempt += 1
+                    self.retried += 1
+                else:
+                    self.breaker.record_success()
+                    settled = True
+                    return result
+        finally:
+            if not settled:
+                self.breaker.release()
+
+    def _start(self, factory: Callable[[], Awaitable[T]]) -> asyncio.Future:
+        """
+        Starts `factory()` in a slot already taken from the limiter, and gives
+        the slot back once it ends.
+        """
+        limiter = self.limiter
+        try:
+            task = asyncio.ensure_future(factory())
+        except BaseException:
+            if limiter is not None:
+                limiter.release()
+            raise
+
+        if limiter is not None:
+            task.add_done_callback(lambda _: limiter.release())
+        return task
+
+    async def _attempt(self, factory: Callable[[], Awaitable[T]]) -> T:
+        if self.limiter is not None:
+            # Queueing for a slot is local, so it must not eat into the deadline
+            await self.limiter.acquire()
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self.timeout
+        tasks: List[asyncio.Future] = [self._start(factory)]
+
+        try:
+            hedge_after = self.latency.percentile(0.95) if self.hedge else None
+            if hedge_after is not None and hedge_after < self.timeout:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                # A hedge that has to queue would only add to the overload
+                if not done and (self.limiter is None or not self.limiter.locked()):
+                    if self.limiter is not None:
+                        await self.limiter.acquire()
+                    self.hedged += 1
+                    tasks.append(self._start(factory))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(0.0, deadline - loop.time()),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    self.timeouts += 1
+                    raise asyncio.TimeoutError(
+                        f"Upstream call exceeded {self.timeout}s deadline"
+                    )
+
+                for task in done:
+                    if task.exception() is None:
+                        self.latency.record(loop.time() - started)
+                        return task.result()
+                    error = task.exception()
+
+            assert error is not None
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Mark the losing attempt's exception as retrieved
+                    task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.stats(),
+            "retried": self.retried,
+            "hedged": self.hedged,
+            "timeouts": self.timeouts,
+            "p95_latency": self.latency.percentile(0.95),
+        }
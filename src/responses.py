@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Optional, Union
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+__all__ = (
+    "FastJSONResponse",
+    "content_etag",
+    "etag_matches",
+    "model_response",
+    "not_modified",
+)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    `JSONResponse` rendered with orjson. Content that is already JSON, as
+    `bytes`, is sent as is, so handlers can return serialized payloads
+    straight from a cache.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            return bytes(content)
+
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def model_response(model: Any, *, by_alias: bool = True) -> FastJSONResponse:
+    """
+    Serialize an already validated model (or None, or a list of models) in
+    one call into pydantic-core. Returning the model from a route instead
+    would have FastAPI validate it against the route's response_model again.
+    """
+    return FastJSONResponse(to_json(model, by_alias=by_alias))
+
+
+def content_etag(body: Union[bytes, memoryview]) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Whether an `If-None-Match` header matches `etag`, using the weak
+    comparison that header calls for.
+    """
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -1,20 +1,129 @@
 from __future__ import annotations
 
+import asyncio
+from typing import List, Optional
+
 from fastapi import APIRouter, Request
-from src.utils import GoogleGenerativeAIHandler
-from pydantic import BaseModel
-from src.app import app
+from fastapi.responses import StreamingResponse
+from src.utils import (
+    QUESTION_BATCH_MAX_ITEMS,
+    QUESTION_MAX_COUNT,
+    QUESTION_CACHE_SWEEP_INTERVAL,
+    GoogleGenerativeAIHandler,
+    _Question,
+)
+from pydantic import BaseModel, Field
+from src.app import app, database, on_shutdown, on_startup
+from src.question_bank import QuestionBank
+from src.responses import content_etag, etag_matches, model_response, not_modified
 
 class ClientReqeust(BaseModel):
-    number_of_questions: int
+    number_of_questions: int = Field(..., gt=0, le=QUESTION_MAX_COUNT)
     selected_topics: list[str]
 
+
+class BatchItem(BaseModel):
+    subject: str
+    number_of_questions: int = Field(..., gt=0, le=QUESTION_MAX_COUNT)
+    selected_topics: list[str] = []
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem] = Field(..., max_length=QUESTION_BATCH_MAX_ITEMS)
+
+
+class BatchItemResult(BaseModel):
+    subject: str
+    questions: Optional[List[_Question]] = None
+    error: Optional[str] = None
+
+
+STREAM_ERROR_LINE = '{"error": "Failed to generate questions"}\n'
+
 router = APIRouter(prefix="/content", tags=["CONTENT"])
-genai = GoogleGenerativeAIHandler()
+question_bank = QuestionBank(database["questions"])
+genai = GoogleGenerativeAIHandler(bank=question_bank)
+
+
+@on_startup
+async def _start_question_services() -> None:
+    genai.cache.start_sweeper(QUESTION_CACHE_SWEEP_INTERVAL)
+    genai.start_prewarmer()
+    genai.start_context_cache()
+
+
+@on_shutdown
+async def _stop_question_services() -> None:
+    await genai.cache.stop_sweeper()
+    await genai.aclose()
 
 
 @router.post("/questions")
 async def fetch_questions(request: Request, data: ClientReqeust):
-    return genai.generate_questions(data.number_of_questions, *data.selected_topics)
+    """
+    Responses carry an `ETag`, so a client asking again while the set is
+    still cached can send `If-None-Match` and get a 304 instead.
+    """
+    questions = await genai.generate_questions(
+        data.number_of_questions, *data.selected_topics
+    )
+    response = model_response(questions)
+    etag = content_etag(response.body)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    response.headers["ETag"] = etag
+    return response
+
+
+@router.post("/questions/stream")
+async def stream_questions(request: Request, data: ClientReqeust) -> StreamingResponse:
+    """
+    Same as `/content/questions`, but emits each question as a line of NDJSON as
+    soon as the model has produced it. If generation fails or stops short, the
+    last line is `{"error": ...}` instead of a question.
+    """
+
+    async def lines():
+        try:
+            async for question in genai.stream_questions(
+                data.number_of_questions, *data.selected_topics
+            ):
+                yield question.model_dump_json() + "\n"
+        except Exception:
+            yield STREAM_ERROR_LINE
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+async def _generate_batch_item(item: BatchItem) -> BatchItemResult:
+    topics = item.selected_topics or [item.subject]
+    response = await genai.generate_questions(item.number_of_questions, *topics)
+    if response is None:
+        return BatchItemResult(
+            subject=item.subject, error="Failed to generate questions"
+        )
+
+    return BatchItemResult(subject=item.subject, questions=response.questions)
+
+
+@router.post("/questions/batch", response_model=List[BatchItemResult])
+async def fetch_questions_batch(
+    request: Request, data: BatchRequest
+) -> List[BatchItemResult]:
+    """
+    Generate questions for several subjects in one round trip. Items are
+    generated concurrently, sharing the handler's limit on in-flight model
+    calls, and each item reports either its questions or an error.
+    """
+    return await asyncio.gather(*map(_generate_batch_item, data.items))
+
+
+@router.get("/stats")
+async def generation_stats(request: Request):
+    """
+    Counters for question generation, e.g. upstream calls issued versus coalesced.
+    """
+    return genai.stats()
 
 app.include_router(router)
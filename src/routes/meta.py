@@ -5,9 +5,9 @@ from typing import Literal
 
 from pydantic import BaseModel, Field
 
-from src.app import app, mongo_client
+from src.app import app, mongo_client, pool_metrics
 
-__all__ = ("ping", "root")
+__all__ = ("metrics", "ping", "root")
 
 
 class PingResponse(BaseModel):
@@ -62,3 +62,11 @@ async def root() -> RootResponse:
     A welcome message for the API. This endpoint is used to check if the API is running; it should always return True.
     """
     return RootResponse(success=True, message="Welcome to PrepLoop API!")
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Runtime metrics for this worker, e.g. MongoDB connection pool checkout waits.
+    """
+    return {"mongo_pool": pool_metrics.stats()}
@@ -1,25 +1,121 @@
 from __future__ import annotations
 
 import os
-from email.message import EmailMessage
-from typing import Optional
+from functools import partial
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic_core import to_json
+from pymongo.errors import DuplicateKeyError
+
+from src.app import app, database, index_manager, on_shutdown, on_startup
+from src.document_json import DocumentWriter
+from src.mail import MailQueue, MailQueueFull, render_otp_email
+from src.models import Interview, ScheduledInterview, User
+from src.otp import BaseOTPHandler, MongoOTPHandler, OTPHandler, OTPThrottled
+from src.repository import InterviewRepository
+from src.responses import (
+    FastJSONResponse,
+    etag_matches,
+    model_response,
+    not_modified,
+)
+from src.user_cache import CachedUserRepository
+
+__all__ = (
+    "create_user",
+    "update_user",
+    "patch_user",
+    "add_interview",
+    "add_scheduled_interview",
+    "patch_scheduled_interview",
+    "fetch_user",
+    "fetch_users",
+    "fetch_history",
+    "user_stats",
+)
 
-from aiosmtplib import send
-from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel, EmailStr
+router = APIRouter(prefix="/user", tags=["User"])
+interviews = InterviewRepository(database["interviews"])
 
-from src.app import app, mongo_client
-from src.models import User
-from src.utils import OTPHandler
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 2**12))
+# Upper bound on how stale a cached user can be when another worker wrote it
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 30))
+USER_CACHE_SWEEP_INTERVAL = float(os.getenv("USER_CACHE_SWEEP_INTERVAL", 60))
+# Drop entries as soon as any worker writes; needs a replica set
+USER_CACHE_WATCH = os.getenv("USER_CACHE_WATCH", "false").lower() == "true"
 
-__all__ = ("create_user", "update_user", "fetch_user")
+users = CachedUserRepository(
+    database["users"], maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL
+)
 
-router = APIRouter(prefix="/user", tags=["User"])
-otp_handler = OTPHandler(cache_size=2**10)
+OTP_TTL = float(os.getenv("OTP_TTL", 300))
+OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", 5))
+OTP_RESEND_INTERVAL = float(os.getenv("OTP_RESEND_INTERVAL", 30))
+
+# "mongo" shares codes between workers and nodes; "memory" is per process
+otp_handler: BaseOTPHandler
+if os.getenv("OTP_BACKEND", "memory") == "mongo":
+    otp_handler = MongoOTPHandler(
+        database["otps"],
+        ttl=OTP_TTL,
+        max_attempts=OTP_MAX_ATTEMPTS,
+        min_interval=OTP_RESEND_INTERVAL,
+    )
+else:
+    otp_handler = OTPHandler(
+        cache_size=2**10,
+        ttl=OTP_TTL,
+        max_attempts=OTP_MAX_ATTEMPTS,
+        min_interval=OTP_RESEND_INTERVAL,
+    )
+
+USER_BULK_MAX_IDS = int(os.getenv("USER_BULK_MAX_IDS", 1000))
+USER_BULK_CHUNK_SIZE = int(os.getenv("USER_BULK_CHUNK_SIZE", 100))
 
 MAIL = os.environ["MAIL"]
 PASS = os.environ["PASS"]
 
+mail_queue = MailQueue(
+    hostname=os.getenv("SMTP_HOST", "smtp.gmail.com"),
+    port=int(os.getenv("SMTP_PORT", 465)),
+    username=MAIL,
+    password=PASS,
+    workers=int(os.getenv("MAIL_WORKERS", 2)),
+    maxsize=int(os.getenv("MAIL_QUEUE_SIZE", 1000)),
+    keepalive=float(os.getenv("SMTP_KEEPALIVE", 60)),
+)
+
+
+@on_startup
+async def _start_mail_queue() -> None:
+    await mail_queue.start()
+
+
+@on_shutdown
+async def _stop_mail_queue() -> None:
+    await mail_queue.stop()
+
+
+@on_startup
+async def _start_user_cache() -> None:
+    users.by_id.start_sweeper(USER_CACHE_SWEEP_INTERVAL)
+    users.by_email.start_sweeper(USER_CACHE_SWEEP_INTERVAL)
+    if USER_CACHE_WATCH:
+        users.start_watcher()
+
+
+@on_shutdown
+async def _stop_user_cache() -> None:
+    await users.stop_watcher()
+    await users.by_id.stop_sweeper()
+    await users.by_email.stop_sweeper()
+
 
 class UserCredential(BaseModel):
     email: str
@@ -31,108 +127,133 @@ class OTP(BaseModel):
     otp: Optional[int] = None
 
 
-async def send_otp_email(email: str, otp: int) -> None:
-    sender_email = MAIL
-    receiver_email = email
-    password = PASS
-
-    message = EmailMessage()
-
-    message["From"] = f"PrepLoop <{sender_email}>"
-    message["To"] = receiver_email
-    message["Subject"] = "PrepLoop Verification Code 🔐"
-
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <body style="margin:0; padding:0; background-color:#f2f6ff; font-family: Arial, sans-serif;">
-        
-        <div style="max-width:600px; margin:40px auto; background:white; padding:30px; border-radius:12px;">
-            
-            <!-- Branding -->
-            <h1 style="text-align:center; color:#2563eb; margin-bottom:5px;">
-                PrepLoop
-            </h1>
-            <p style="text-align:center; color:#6b7280; margin-top:0;">
-                Smart Interview Preparation
-            </p>
-
-            <!-- Title -->
-            <h2 style="text-align:center; color:#111827;">
-                Verify Your Email
-            </h2>
-
-            <!-- Message -->
-            <p style="text-align:center; color:#374151; font-size:16px;">
-                Use the OTP below to continue with <b>PrepLoop</b>.
-            </p>
-
-            <!-- OTP Box -->
-            <div style="text-align:center; margin:30px 0;">
-                <span style="
-                    display:inline-block;
-                    background:#2563eb;
-                    color:white;
-                    font-size:30px;
-                    letter-spacing:10px;
-                    padding:15px 30px;
-                    border-radius:10px;
-                    font-weight:bold;
-                ">
-                    {otp}
-                </span>
-            </div>
-
-            <!-- Info -->
-            <p style="text-align:center; color:#6b7280; font-size:14px;">
-                This OTP is valid for <b>5 minutes</b>.
-            </p>
-
-            <p style="text-align:center; color:#9ca3af; font-size:12px;">
-                Do not share this code with anyone.
-            </p>
-
-            <hr style="margin:25px 0; border:none; border-top:1px solid #e5e7eb;">
-
-            <!-- Footer -->
-            <p style="text-align:center; font-size:12px; color:#9ca3af;">
-                Didn’t request this? You can safely ignore this email.
-            </p>
-
-            <p style="text-align:center; font-size:12px; color:#d1d5db;">
-                © 2026 PrepLoop. All rights reserved.
-            </p>
-
-        </div>
-
-    </body>
-    </html>
-    """
+class BulkFetch(BaseModel):
+    ids: List[str] = Field(..., max_length=USER_BULK_MAX_IDS)
+    # Same as the `fields` query parameter of `/user/fetch`
+    fields: Optional[str] = None
+
+
+def _not_null(value: Any) -> Any:
+    # Fields may be left out of a patch, but not set to null
+    if value is None:
+        raise ValueError("may not be null")
+    return value
 
-    message.add_alternative(html_content, subtype="html")
 
-    await send(
-        message,
-        hostname="smtp.gmail.com",
-        port=465,
-        username=sender_email,
-        password=password,
-        use_tls=True,
+class UserPatch(BaseModel):
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[str] = None
+    password: Optional[str] = None
+
+    _required = field_validator("first_name", "email", "password")(_not_null)
+
+
+class ScheduledInterviewPatch(BaseModel):
+    subject: Optional[str] = None
+    topics: Optional[List[str]] = None
+    duration: Optional[float] = None
+    date: Optional[datetime] = None
+    is_completed: Optional[bool] = None
+
+    _required = field_validator("subject", "topics", "duration", "date")(_not_null)
+
+
+def send_otp_email(email: str, otp: int) -> None:
+    mail_queue.enqueue(
+        partial(
+            render_otp_email,
+            sender=MAIL,
+            receiver=email,
+            otp=otp,
+            valid_minutes=round(OTP_TTL / 60),
+        )
     )
 
 
-async def _fetch_user(*, email: str, password: str) -> User:
-    collection = mongo_client["PrepLoop"]["users"]
-    user = await collection.find_one({"email": email, "password": password})
-    if user is None:
-        raise HTTPException(status_code=404, detail="User not found")
+# Fields a client can ask for; history is paged through /user/{_id}/history
+USER_FIELDS = frozenset(User.model_fields) - {"history"}
+
+# For `raw` reads, which send stored documents without loading them as models
+USER_JSON = DocumentWriter()
+INTERVIEW_JSON = DocumentWriter(rename={"_id": "id"}, exclude={"user_id"})
+
 
-    return User.model_validate(user)
+class InterviewPage(BaseModel):
+    items: List[Interview]
+    next_cursor: Optional[str] = None
 
 
-async def user_exists(*, email: str) -> bool:
-    collection = mongo_client["PrepLoop"]["users"]
-    return await collection.count_documents({"email": email}) > 0
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if fields is None:
+        return None
+
+    parsed = [field.strip() for field in fields.split(",") if field.strip()]
+    if not parsed:
+        raise HTTPException(status_code=400, detail="No fields requested")
+
+    unknown = set(parsed) - USER_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+
+    return ["_id" if field == "id" else field for field in parsed]
+
+
+def _user_etag(version: int, *, raw: bool = False) -> str:
+    # The raw body differs from the validated one (no `history` key), so it
+    # gets its own tag
+    return f'"v{version}-raw"' if raw else f'"v{version}"'
+
+
+def _if_match_version(request: Request) -> Optional[int]:
+    """
+    The version an `If-Match` header asks for, or None if there is no
+    header or it is `*`.
+    """
+    header = request.headers.get("if-match")
+    if header is None or header.strip() == "*":
+        return None
+
+    tag = header.split(",")[0].strip().replace("-raw", "", 1)
+    if tag.startswith('"v') and tag.endswith('"') and tag[2:-1].isdigit():
+        return int(tag[2:-1])
+
+    # Weak or foreign tags never match under If-Match
+    raise HTTPException(status_code=412, detail="User has been modified")
+
+
+def _with_etag(response: Response, version: int, *, raw: bool = False) -> Response:
+    response.headers["ETag"] = _user_etag(version, raw=raw)
+    return response
+
+
+def _render_user(user: Dict[str, Any]) -> bytes:
+    return to_json(User.model_validate(user), by_alias=True)
+
+
+def _user_response(user: Dict[str, Any], fields: Optional[List[str]]) -> Response:
+    # A partial document is not a valid User, and is already plain JSON
+    if fields is not None:
+        return FastJSONResponse(user)
+
+    # Validated and serialized once per version, then served as bytes
+    body = users.render(user, _render_user)
+    return _with_etag(FastJSONResponse(body), user.get("version", 0))
+
+
+async def _fetch_user(
+    *, email: str, password: str, fields: Optional[str] = None
+) -> Response:
+    projection = _parse_fields(fields)
+    user = await users.find_by_credentials(
+        email=email, password=password, fields=projection
+    )
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    return _user_response(user, projection)
 
 
 @router.post(
@@ -140,53 +261,128 @@ async def user_exists(*, email: str) -> bool:
     response_model=User,
     responses={400: {"description": "User already exists"}, 422: {}},
 )
-async def create_user(request: Request, data: User) -> User:
-    if await user_exists(email=data.email):
-        raise HTTPException(status_code=400, detail="User already exists")
-
-    collection = mongo_client["PrepLoop"]["users"]
-    sendable_data = data.model_dump(mode="json")
+async def create_user(request: Request, data: User) -> Response:
+    sendable_data = data.model_dump(mode="json", exclude={"history"})
     sendable_data["_id"] = sendable_data.pop("id")
 
-    await collection.insert_one(sendable_data)
+    # The unique index on email makes this a single, race-free round trip.
+    # Until it is confirmed built, check for the email first as well
+    if not index_manager.is_ready("email_unique"):
+        if await users.find_by_email(data.email) is not None:
+            raise HTTPException(status_code=400, detail="User already exists")
 
-    return data
+    try:
+        await users.insert(sendable_data)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="User already exists")
+
+    await interviews.upsert_many(sendable_data["_id"], data.history)
+    return model_response(data)
 
 
 @router.post(
     "/fetch",
     response_model=User,
-    responses={404: {"description": "User not found"}, 422: {}},
+    responses={
+        400: {"description": "Unknown or no fields"},
+        404: {"description": "User not found"},
+        422: {},
+    },
 )
-async def fetch_user(request: Request, data: UserCredential):
+async def fetch_user(
+    request: Request, data: UserCredential, fields: Optional[str] = None
+):
     """
-    Fetch user details using email and password.
+    Fetch user details using email and password. `fields` is a comma
+    separated list of the fields to return, e.g. `first_name,scheduled_interviews`.
     """
-    return await _fetch_user(email=data.email, password=data.password)
+    return await _fetch_user(email=data.email, password=data.password, fields=fields)
 
 
 @router.get(
     "/fetch/{_id}",
     response_model=User,
-    responses={404: {"description": "User not found"}, 422: {}},
+    responses={
+        304: {"description": "User not modified"},
+        400: {"description": "Unknown or no fields"},
+        404: {"description": "User not found"},
+        422: {},
+    },
 )
-async def fetch_user_by_id(request: Request, _id: str) -> User:
+async def fetch_user_by_id(
+    request: Request, _id: str, fields: Optional[str] = None, raw: bool = False
+) -> Response:
     """
-    Fetch user details using the user ID.
+    Fetch user details using the user ID. `fields` works as in `/user/fetch`.
+    With `raw`, the stored document is written out as is. It is read the
+    same way; only model validation is skipped, which is cheaper for large
+    documents.
+
+    Full documents carry an `ETag`; send it back in `If-None-Match` to get
+    a 304 when the user has not changed since.
     """
-    collection = mongo_client["PrepLoop"]["users"]
-    user = await collection.find_one({"_id": _id})
+    projection = _parse_fields(fields)
+    if_none_match = request.headers.get("if-none-match")
+    if projection is None and if_none_match is not None:
+        # Answered from the cache, or by a query that returns only the version
+        version = await users.find_version(_id)
+        etag = None if version is None else _user_etag(version, raw=raw)
+        if etag is not None and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    if raw:
+        document = await users.find_by_id(_id, fields=projection)
+        if document is None:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        response = FastJSONResponse(USER_JSON.dumps_document(document))
+        if projection is None:
+            _with_etag(response, document.get("version", 0), raw=True)
+        return response
+
+    user = await users.find_by_id(_id, fields=projection)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return User.model_validate(user)
+    return _user_response(user, projection)
+
+
+@router.post(
+    "/bulk",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"application/x-ndjson": {}}},
+        400: {"description": "Unknown or no fields"},
+        422: {},
+    },
+)
+async def fetch_users(request: Request, data: BulkFetch) -> StreamingResponse:
+    """
+    Fetch many users by ID. Emits one line of NDJSON per requested ID, in
+    request order: the user document, or `{"_id": ..., "error": "User not found"}`.
+    """
+    projection = _parse_fields(data.fields)
+    ids = list(dict.fromkeys(data.ids))
+
+    async def lines():
+        start = 0
+        async for found in users.find_many(
+            ids, fields=projection, chunk_size=USER_BULK_CHUNK_SIZE
+        ):
+            by_id = {user["_id"]: user for user in found}
+            for _id in ids[start : start + USER_BULK_CHUNK_SIZE]:
+                user = by_id.get(_id, {"_id": _id, "error": "User not found"})
+                yield orjson.dumps(user) + b"\n"
+            start += USER_BULK_CHUNK_SIZE
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @router.delete("/delete/{_id}")
 async def delete_user_by_id(request: Request, _id: str) -> bool:
     """Delete user details using the user ID"""
-    collection = mongo_client["PrepLoop"]["users"]
-    await collection.delete_one({"_id": _id})
+    await users.delete(_id)
+    await interviews.delete_for_user(_id)
     return True
 
 
@@ -196,41 +392,235 @@ async def delete_user_by_id(request: Request, _id: str) -> bool:
     responses={
         400: {"description": "Invalid update operation"},
         404: {"description": "User not found"},
+        412: {"description": "User has been modified"},
         422: {},
     },
 )
-async def update_user(request: Request, user: User) -> User:
+async def update_user(request: Request, user: User) -> Response:
     """
-    Update user details based on the user ID.
+    Update user details based on the user ID. Interviews in `history` are
+    added or replaced by id; ones left out are kept. Send the `ETag` the user
+    was read with in `If-Match` to only update if nobody else has since.
     """
-    collection = mongo_client["PrepLoop"]["users"]
+    expected = _if_match_version(request)
+    user_dumped = user.model_dump(mode="json", exclude={"history", "version"})
+    user_dumped.pop("_id", None)
     try:
-        user_dumped = user.model_dump(mode="json")
-        user_dumped.pop("_id", None)
-        result = await collection.update_one(
-            {"_id": str(user.id)},
-            {"$set": user_dumped},
+        stored = await users.modify(
+            str(user.id), {"$set": user_dumped}, version=expected
         )
-        if result.modified_count == 0:
-            raise HTTPException(
-                status_code=404, detail="User not found or no changes applied"
-            )
+        if stored is not None:
+            await interviews.upsert_many(str(user.id), user.history)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    return user
+    if stored is None:
+        if expected is not None and await users.exists(str(user.id)):
+            raise HTTPException(status_code=412, detail="User has been modified")
+        raise HTTPException(status_code=404, detail="User not found")
+
+    user.version = stored["version"]
+    return _with_etag(model_response(user), user.version)
+
+
+async def _modify_user(
+    request: Request,
+    _id: str,
+    update: Dict[str, Any],
+    *,
+    where: Optional[Dict[str, Any]] = None,
+    array_filters: Optional[List[Dict[str, Any]]] = None,
+) -> Response:
+    """
+    Applies `update`, only if the `If-Match` header (when sent) still
+    matches the stored version.
+    """
+    version = _if_match_version(request)
+    try:
+        user = await users.modify(
+            _id, update, version=version, where=where, array_filters=array_filters
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already in use")
+
+    if user is not None:
+        return _user_response(user, None)
+
+    # Only the failure path pays for a second read, to tell the cases apart
+    if version is not None and await users.exists(_id, where=where):
+        raise HTTPException(status_code=412, detail="User has been modified")
+
+    raise HTTPException(status_code=404, detail="User not found")
+
+
+@router.patch(
+    "/{_id}",
+    response_model=User,
+    responses={
+        400: {"description": "Email already in use"},
+        404: {"description": "User not found"},
+        412: {"description": "User has been modified"},
+        422: {},
+    },
+)
+async def patch_user(request: Request, _id: str, data: UserPatch) -> Response:
+    """
+    Update only the given profile fields. `If-Match` works as in
+    `/user/update`, here and on the scheduled interview routes.
+    """
+    fields = data.model_dump(exclude_unset=True)
+    if not fields:
+        raise HTTPException(status_code=400, detail="No fields to update")
+
+    return await _modify_user(request, _id, {"$set": fields})
+
+
+@router.post(
+    "/{_id}/history",
+    response_model=Interview,
+    responses={
+        400: {"description": "Interview already exists"},
+        404: {"description": "User not found"},
+        422: {},
+    },
+)
+async def add_interview(request: Request, _id: str, data: Interview) -> Response:
+    """
+    Append one interview to the user's history.
+    """
+    # Bumping the version doubles as the check that the user exists, so
+    # history is never written for an unknown id
+    if await users.modify(_id, {}) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # History lives in its own collection, so this is an insert, not a $push
+    try:
+        await interviews.insert(_id, data)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Interview already exists")
+
+    return model_response(data)
+
+
+@router.post(
+    "/{_id}/scheduled-interviews",
+    response_model=User,
+    responses={
+        404: {"description": "User not found"},
+        412: {"description": "User has been modified"},
+        422: {},
+    },
+)
+async def add_scheduled_interview(
+    request: Request, _id: str, data: ScheduledInterview
+) -> Response:
+    """
+    Append one scheduled interview.
+    """
+    return await _modify_user(
+        request,
+        _id,
+        {"$push": {"scheduled_interviews": data.model_dump(mode="json")}},
+    )
+
+
+@router.patch(
+    "/{_id}/scheduled-interviews/{interview_id}",
+    response_model=User,
+    responses={
+        404: {"description": "User or scheduled interview not found"},
+        412: {"description": "User has been modified"},
+        422: {},
+    },
+)
+async def patch_scheduled_interview(
+    request: Request, _id: str, interview_id: UUID, data: ScheduledInterviewPatch
+) -> Response:
+    """
+    Update only the given fields of one scheduled interview.
+    """
+    fields = data.model_dump(mode="json", exclude_unset=True)
+    if not fields:
+        raise HTTPException(status_code=400, detail="No fields to update")
+
+    return await _modify_user(
+        request,
+        _id,
+        {"$set": {f"scheduled_interviews.$[item].{k}": v for k, v in fields.items()}},
+        where={"scheduled_interviews.id": str(interview_id)},
+        array_filters=[{"item.id": str(interview_id)}],
+    )
+
+
+@router.get(
+    "/{_id}/history",
+    response_model=InterviewPage,
+    responses={400: {"description": "Invalid cursor"}, 422: {}},
+)
+async def fetch_history(
+    request: Request,
+    _id: str,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    raw: bool = False,
+) -> Response:
+    """
+    Fetch the interview history of a user, newest first. Pass `next_cursor`
+    from a page as `cursor` to get the next one. `raw` works as in
+    `/user/fetch/{_id}`.
+    """
+    try:
+        if raw:
+            documents, next_cursor = await interviews.page_documents_for_user(
+                _id, limit=limit, cursor=cursor
+            )
+            return FastJSONResponse(INTERVIEW_JSON.dumps_page(documents, next_cursor))
+
+        items, next_cursor = await interviews.page_for_user(
+            _id, limit=limit, cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return model_response(InterviewPage(items=items, next_cursor=next_cursor))
+
+
+@router.get("/stats")
+async def user_stats(request: Request):
+    """
+    Hit ratio and size of the user cache.
+    """
+    return users.stats()
 
 
 @router.post(
     "/otp/generate",
     response_model=OTP,
+    responses={
+        429: {"description": "OTP requested too recently"},
+        503: {"description": "Mail queue is full"},
+    },
 )
 async def generate_otp(request: Request, email: EmailStr) -> OTP:
     """
     Generate OTP based on email
     """
-    otp = otp_handler.generate_otp(email=email)
-    await send_otp_email(email, otp)
+    try:
+        otp = await otp_handler.generate_otp(email=email)
+    except OTPThrottled as e:
+        raise HTTPException(
+            status_code=429,
+            detail="OTP requested too recently",
+            headers={"Retry-After": str(round(e.retry_after))},
+        )
+
+    try:
+        send_otp_email(email, otp)
+    except MailQueueFull:
+        # The code will never arrive, so it must not throttle the retry
+        await otp_handler.revoke_otp(email=email, otp=otp)
+        raise HTTPException(status_code=503, detail="Please try again shortly")
+
     return OTP(email=email)
 
 
@@ -239,19 +629,16 @@ async def validate_otp(request: Request, otp: OTP):
     """
     Validate OTP given by the server
     """
-    status = otp_handler.validate_otp(email=otp.email, otp=otp.otp or -1)
-    collection = mongo_client["PrepLoop"]["users"]
-    user = await collection.find_one({"email": otp.email})
-
+    status = await otp_handler.validate_otp(email=otp.email, otp=otp.otp or -1)
     if status:
-        return user
-    
+        return FastJSONResponse(await users.find_by_email(otp.email))
+
     return None
 
 
 @router.post("/otp/validate-only")
 async def validate_otp_only(request: Request, otp: OTP):
-    return otp_handler.validate_otp(email=otp.email, otp=otp.otp or -1)
+    return await otp_handler.validate_otp(email=otp.email, otp=otp.otp or -1)
 
 
 app.include_router(router)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any, Callable, Collection, Dict, List, Optional, Tuple
+
+from .cache import TTLCache
+from .repository import Document, UserRepository
+
+if TYPE_CHECKING:
+    from pymongo.asynchronous.collection import AsyncCollection
+    from pymongo.results import DeleteResult, InsertOneResult
+
+__all__ = ("CachedUserRepository",)
+
+log = logging.getLogger(__name__)
+
+
+class CachedUserRepository(UserRepository):
+    """
+    `UserRepository` with a read-through cache of user documents by id, and
+    of ids by email. Writes made through this repository invalidate the
+    cache right away; writes from other workers are picked up when the entry
+    expires after `ttl` seconds, or right away if :meth:`start_watcher` is
+    running. Cached documents are shared, so callers must not mutate them.
+
+    :meth:`render` also keeps the JSON of whole users, so that cache hits
+    skip validation and serialization entirely.
+    """
+
+    def __init__(
+        self,
+        collection: AsyncCollection[Document],
+        *,
+        maxsize: int = 2**12,
+        ttl: float = 30.0,
+    ):
+        super().__init__(collection)
+        self.by_id: TTLCache[Document] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.by_email: TTLCache[str] = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Keyed by (id, version), so a newer document never gets an old body
+        self.rendered: TTLCache[bytes] = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Bumped on every invalidation, so a read that raced with a write
+        # does not put the document it read before the write into the cache
+        self._generation = 0
+        self._watcher: Optional[asyncio.Task] = None
+
+    def invalidate(self, _id: Any) -> None:
+        self._generation += 1
+        self.by_id.pop(_id)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self.by_id.clear()
+        self.by_email.clear()
+        self.rendered.clear()
+
+    def _remember(self, user: Document, generation: int) -> None:
+        if generation == self._generation:
+            self.by_id.set(user["_id"], user)
+            self.by_email.set(user["email"], user["_id"])
+
+    def _cached_by_email(self, email: str) -> Optional[Document]:
+        _id = self.by_email.get(email)
+        if _id is None:
+            return None
+
+        user = self.by_id.get(_id)
+        # The email may have changed since it was mapped to this id
+        if user is None or user.get("email") != email:
+            return None
+
+        return user
+
+    async def find_by_id(
+        self, _id: str, *, fields: Optional[Collection[str]] = None
+    ) -> Optional[Document]:
+        user = self.by_id.get(_id)
+        if user is None:
+            generation = self._generation
+            user = await super().find_by_id(_id)
+            if user is None:
+                return None
+            self._remember(user, generation)
+
+        if not fields:
+            return user
+
+        return {key: user[key] for key in ("_id", *fields) if key in user}
+
+    def render(self, user: Document, render: Callable[[Document], bytes]) -> bytes:
+        """
+        `render(user)`, remembered for the user's id and version. Every write
+        bumps the version, so the body is reused only for the same document.
+        """
+        key: Tuple[Any, int] = (user["_id"], user.get("version", 0))
+        body = self.rendered.get(key)
+        if body is None:
+            body = render(user)
+            self.rendered.set(key, body)
+        return body
+
+    async def find_by_email(self, email: str) -> Optional[Document]:
+        user = self._cached_by_email(email)
+        if user is not None:
+            return user
+
+        generation = self._generation
+        user = await super().find_by_email(email)
+        if user is not None:
+            self._remember(user, generation)
+
+        return user
+
+    async def find_version(self, _id: str) -> Optional[int]:
+        user = self.by_id.get(_id)
+        if user is not None:
+            return user.get("version", 0)
+
+        return await super().find_version(_id)
+
+    async def insert(self, document: Document) -> InsertOneResult:
+        try:
+            return await super().insert(document)
+        finally:
+            self.invalidate(document["_id"])
+
+    async def modify(
+        self,
+        _id: str,
+        update: Document,
+        *,
+        version: Optional[int] = None,
+        where: Optional[Document] = None,
+        array_filters: Optional[List[Document]] = None,
+    ) -> Optional[Document]:
+        try:
+            return await super().modify(
+                _id, update, version=version, where=where, array_filters=array_filters
+            )
+        finally:
+            self.invalidate(_id)
+
+    async def delete(self, _id: str) -> DeleteResult:
+        try:
+            return await super().delete(_id)
+        finally:
+            self.invalidate(_id)
+
+    async def _watch_forever(self, retry_interval: float) -> None:
+        while True:
+            try:
+                async with await self.collection.watch(
+                    [{"$project": {"documentKey": 1}}]
+                ) as stream:
+                    # Anything written while we were not listening is unknown
+                    self.clear()
+                    async for change in stream:
+                        self.invalidate(change["documentKey"]["_id"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("User change stream failed, retrying")
+
+            await asyncio.sleep(retry_interval)
+
+    def start_watcher(self, retry_interval: float = 5.0) -> None:
+        """
+        Invalidate entries as soon as any worker changes a user, through a
+        change stream on the collection. Needs a replica set or sharded
+        cluster.
+        """
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch_forever(retry_interval))
+
+    async def stop_watcher(self) -> None:
+        if self._watcher is None:
+            return
+
+        self._watcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._watcher
+        self._watcher = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "by_id": self.by_id.stats(),
+            "by_email": self.by_email.stats(),
+            "rendered": self.rendered.stats(),
+            "watching": self._watcher is not None and not self._watcher.done(),
+        }
@@ -1,21 +1,98 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
+import math
 import os
-import random
-from typing import List, Optional
-
-import lru
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 from dotenv import load_dotenv
 from google import genai
-from google.genai.types import Content, GenerateContentConfig, Part
+from google.genai import errors as genai_errors
+from google.genai.types import (
+    Content,
+    CreateCachedContentConfig,
+    GenerateContentConfig,
+    GenerateContentResponseUsageMetadata,
+    Part,
+    UpdateCachedContentConfig,
+)
 from pydantic import BaseModel
 
+from .cache import DecayedCounter, TTLCache
+from .resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
+
+if TYPE_CHECKING:
+    from .question_bank import QuestionBank
+
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+# Upper bound on Gemini requests in flight per worker.
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", 8))
+# Requests for more questions than this are split into concurrent calls of
+# at most GEMINI_SHARD_SIZE questions each
+GEMINI_SHARD_THRESHOLD = int(os.getenv("GEMINI_SHARD_THRESHOLD", 10))
+GEMINI_SHARD_SIZE = int(os.getenv("GEMINI_SHARD_SIZE", 5))
+# Past this many shards, shards grow instead of multiplying
+GEMINI_MAX_SHARDS = int(os.getenv("GEMINI_MAX_SHARDS", 8))
+# Deadline per model call, and retries with jittered exponential backoff
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", 30))
+GEMINI_RETRIES = int(os.getenv("GEMINI_RETRIES", 2))
+GEMINI_BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", 0.5))
+GEMINI_BACKOFF_MAX = float(os.getenv("GEMINI_BACKOFF_MAX", 8))
+# Start a duplicate call when the first one runs past the recent p95 latency
+GEMINI_HEDGE = os.getenv("GEMINI_HEDGE", "false").lower() in ("1", "true", "yes")
+# Consecutive failures that open the circuit, and seconds before a trial call
+GEMINI_BREAKER_THRESHOLD = int(os.getenv("GEMINI_BREAKER_THRESHOLD", 5))
+GEMINI_BREAKER_RESET = float(os.getenv("GEMINI_BREAKER_RESET", 30))
+# Lifetime of the server-side cache holding SYSTEM_INSTRUCTION; 0 disables it
+GEMINI_CONTEXT_CACHE_TTL = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", 0))
+# Gemini refuses to cache less than this (1024 for Flash models, more for Pro)
+GEMINI_CONTEXT_CACHE_MIN_TOKENS = int(
+    os.getenv("GEMINI_CONTEXT_CACHE_MIN_TOKENS", 1024)
+)
+
+QUESTION_CACHE_SIZE = int(os.getenv("QUESTION_CACHE_SIZE", 2**10))
+QUESTION_CACHE_TTL = float(os.getenv("QUESTION_CACHE_TTL", 600))
+QUESTION_CACHE_SWEEP_INTERVAL = float(os.getenv("QUESTION_CACHE_SWEEP_INTERVAL", 60))
+
+# Topics holding fewer banked questions than this are replenished in the background
+QUESTION_BANK_MIN_PER_TOPIC = int(os.getenv("QUESTION_BANK_MIN_PER_TOPIC", 50))
+QUESTION_BANK_REPLENISH_BATCH = int(os.getenv("QUESTION_BANK_REPLENISH_BATCH", 20))
+
+QUESTION_BATCH_MAX_ITEMS = int(os.getenv("QUESTION_BATCH_MAX_ITEMS", 20))
+# Most questions a single request may ask for
+QUESTION_MAX_COUNT = int(os.getenv("QUESTION_MAX_COUNT", 50))
+
+# Refresh-ahead: the hottest cached keys are regenerated shortly before expiry
+PREWARM_TOP_K = int(os.getenv("PREWARM_TOP_K", 20))
+PREWARM_LEAD = float(os.getenv("PREWARM_LEAD", 60))
+PREWARM_INTERVAL = float(os.getenv("PREWARM_INTERVAL", 15))
+PREWARM_CALLS_PER_MINUTE = float(os.getenv("PREWARM_CALLS_PER_MINUTE", 30))
+PREWARM_MIN_SCORE = float(os.getenv("PREWARM_MIN_SCORE", 2))
+PREWARM_HALF_LIFE = float(os.getenv("PREWARM_HALF_LIFE", 600))
+
+
+def normalize_topic(topic: str) -> str:
+    return " ".join(topic.split()).casefold()
 
 
 class _Question(BaseModel):
@@ -27,28 +104,82 @@ class _Response(BaseModel):
     questions: List[_Question]
 
 
-class OTPHandler:
-    def __init__(self, cache_size: int = 2**10):
-        self.cache_size = cache_size
-        self.lru = lru.LRU(self.cache_size)
+class _IncompleteResponse(Exception):
+    """Raised when fewer questions came back than were asked for."""
 
-    def _generate_otp(self) -> int:
-        return random.randint(100_000, 999_999)
 
-    def generate_otp(self, *, email: str) -> int:
-        self.lru[email] = self._generate_otp()
-        return self.lru[email]
+def _estimated_tokens(text: str) -> int:
+    # Roughly four characters per token for English text
+    return len(text) // 4
 
-    def validate_otp(self, *, email: str, otp: int) -> bool:
-        try:
-            self.lru[email]
-            validate = self.lru[email] == otp
-            if validate:
-                del self.lru[email]
 
-            return validate
-        except KeyError:
-            return False
+def _is_retryable(exc: BaseException) -> bool:
+    # Other 4xx responses mean the request itself is wrong; repeating it won't help
+    if isinstance(exc, genai_errors.ClientError):
+        return exc.code in (408, 429)
+    return True
+
+
+class _QuestionStreamParser:
+    """
+    Incrementally scans a streamed `_Response` JSON document and returns each
+    object of the `questions` array as soon as its closing brace arrives.
+    """
+
+    # Nesting of `{"questions": [` around every question object
+    _ITEM_DEPTH = ["{", "["]
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._start: Optional[int] = None
+
+    def feed(self, text: str) -> List[_Question]:
+        buffer = self._buffer + text
+        questions: List[_Question] = []
+
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if char == "{" and self._stack == self._ITEM_DEPTH:
+                    self._start = i
+                self._stack.append(char)
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if (
+                    char == "}"
+                    and self._start is not None
+                    and self._stack == self._ITEM_DEPTH
+                ):
+                    try:
+                        questions.append(
+                            _Question.model_validate_json(buffer[self._start : i + 1])
+                        )
+                    except ValueError:
+                        pass
+                    self._start = None
+
+        # Only an unfinished question object needs to be kept around
+        keep = len(buffer) if self._start is None else self._start
+        self._buffer = buffer[keep:]
+        self._pos = len(buffer) - keep
+        if self._start is not None:
+            self._start = 0
+
+        return questions
 
 
 SYSTEM_INSTRUCTION = """
@@ -65,52 +196,556 @@ You are a professional Intervier with experience of 15yr, and have expertise in
 
 
 class GoogleGenerativeAIHandler:
-    CACHE_DURATION = timedelta(minutes=10)
+    CACHE_DURATION = timedelta(seconds=QUESTION_CACHE_TTL)
 
-    def __init__(self):
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = GEMINI_MAX_CONCURRENCY,
+        cache_size: int = QUESTION_CACHE_SIZE,
+        bank: Optional[QuestionBank] = None,
+    ):
         self.client = genai.Client(api_key=GEMINI_API_KEY)
-        # Store (response, timestamp) for each key
-        self._temp = {}
+        # Bounds concurrent calls so a burst cannot exhaust the upstream quota
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.resilience = ResilientCaller(
+            timeout=GEMINI_TIMEOUT,
+            retries=GEMINI_RETRIES,
+            backoff_base=GEMINI_BACKOFF_BASE,
+            backoff_max=GEMINI_BACKOFF_MAX,
+            hedge=GEMINI_HEDGE,
+            breaker=CircuitBreaker(
+                failure_threshold=GEMINI_BREAKER_THRESHOLD,
+                reset_timeout=GEMINI_BREAKER_RESET,
+            ),
+            retryable=_is_retryable,
+            limiter=self._semaphore,
+        )
+        self.fallbacks = 0
+        self.cache: TTLCache[_Response] = TTLCache(
+            maxsize=cache_size, ttl=self.CACHE_DURATION.total_seconds()
+        )
+        # Generations currently running, shared by identical concurrent requests
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self.issued_calls = 0
+        self.coalesced_calls = 0
 
-    def generate_questions(
-        self, number_of_questions: int, *selected_topics: str
+        self.bank = bank
+        self.bank_hits = 0
+        # Keeps references to fire-and-forget tasks so they are not collected
+        self._background: Set[asyncio.Task] = set()
+
+        self.popularity: DecayedCounter[Tuple] = DecayedCounter(
+            half_life=PREWARM_HALF_LIFE
+        )
+        self.prewarmed = 0
+
+        # Server-side cached content for SYSTEM_INSTRUCTION, see start_context_cache
+        self._context_cache: Optional[str] = None
+        self._context_cache_expires = datetime.min.replace(tzinfo=timezone.utc)
+        self.token_usage = {
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "output_tokens": 0,
+            "total_tokens": 0,
+        }
+
+    @staticmethod
+    def _make_key(number_of_questions: int, selected_topics: Tuple[str, ...]) -> Tuple:
+        topics = sorted({normalize_topic(topic) for topic in selected_topics})
+        return (number_of_questions, *topics)
+
+    async def _single_flight(
+        self, key: Tuple, factory: Callable[[], Awaitable[_Response]]
+    ) -> _Response:
+        task = self._inflight.get(key)
+        if task is None:
+            self.issued_calls += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._release, key))
+        else:
+            self.coalesced_calls += 1
+
+        # Shielded so a disconnecting caller does not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _release(self, key: Tuple, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "issued_calls": self.issued_calls,
+            "coalesced_calls": self.coalesced_calls,
+            "inflight": len(self._inflight),
+            "bank_hits": self.bank_hits,
+            "prewarmed": self.prewarmed,
+            "context_cache": self._context_cache,
+            "token_usage": self.token_usage,
+            "fallbacks": self.fallbacks,
+            "resilience": self.resilience.stats(),
+            "cache": self.cache.stats(),
+        }
+
+    def _spawn(self, coro: Awaitable[Any]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def aclose(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        await self.client.aio.aclose()
+
+    async def _prewarm(self, key: Tuple) -> None:
+        number_of_questions, *topics = key
+        try:
+            await self._single_flight(
+                key,
+                lambda: self._generate_and_store(
+                    key, number_of_questions, tuple(topics)
+                ),
+            )
+        except Exception:
+            log.exception("Failed to prewarm questions for %r", key)
+            return
+
+        self.prewarmed += 1
+
+    def _calls_for(
+        self, number_of_questions: int, selected_topics: Tuple[str, ...]
+    ) -> int:
+        """Model calls one generation takes on its first attempt."""
+        if number_of_questions <= GEMINI_SHARD_THRESHOLD:
+            return 1
+        return len(self._shards(number_of_questions, selected_topics))
+
+    def _due_for_prewarm(self, budget: int) -> List[Tuple]:
+        """
+        The popular keys about to expire, hottest first, whose generations
+        fit in `budget` model calls together.
+        """
+        due = []
+        for key, score in self.popularity.top(PREWARM_TOP_K):
+            if score < PREWARM_MIN_SCORE:
+                break
+            if key in self._inflight or (
+                (self.cache.ttl_remaining(key) or 0) >= PREWARM_LEAD
+            ):
+                continue
+
+            number_of_questions, *topics = key
+            calls = self._calls_for(number_of_questions, tuple(topics))
+            if calls <= budget:
+                budget -= calls
+                due.append(key)
+
+        return due
+
+    async def _prewarm_forever(self, interval: float) -> None:
+        budget = max(1, int(PREWARM_CALLS_PER_MINUTE * interval / 60))
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.gather(*map(self._prewarm, self._due_for_prewarm(budget)))
+
+    def start_prewarmer(self, interval: float = PREWARM_INTERVAL) -> None:
+        """
+        Keep popular topic sets warm by regenerating them before their cache
+        entries expire, within PREWARM_CALLS_PER_MINUTE model calls. A sharded
+        set counts as one call per shard; retries are not budgeted.
+        """
+        if PREWARM_TOP_K > 0 and PREWARM_CALLS_PER_MINUTE > 0:
+            self._spawn(self._prewarm_forever(interval))
+
+    async def _replenish(self, topic: str) -> None:
+        assert self.bank is not None
+        try:
+            response = await self._single_flight(
+                ("bank", topic),
+                lambda: self._generate(QUESTION_BANK_REPLENISH_BATCH, (topic,)),
+            )
+            await self.bank.add(topic, response.questions)
+        except Exception:
+            log.exception("Failed to replenish question bank for %r", topic)
+
+    async def _from_bank(
+        self, number_of_questions: int, selected_topics: Tuple[str, ...]
     ) -> Optional[_Response]:
-        
-        current_time = datetime.utcnow()
-        cached = self._temp.get(selected_topics)
-
-        if cached:
-            response, timestamp = cached
-            if current_time - timestamp < self.CACHE_DURATION:
-                return response
+        assert self.bank is not None
+        try:
+            counts = await self.bank.counts(selected_topics)
+            for topic, count in counts.items():
+                if (
+                    count < QUESTION_BANK_MIN_PER_TOPIC
+                    and ("bank", topic) not in self._inflight
+                ):
+                    self._spawn(self._replenish(topic))
+
+            # Every topic must cover its share, or the set would skip topics
+            quotas = self.bank.quotas(selected_topics, number_of_questions)
+            if any(counts[topic] < quota for topic, quota in quotas.items()):
+                return None
+
+            questions = await self.bank.sample(selected_topics, number_of_questions)
+        except Exception:
+            log.exception("Question bank lookup failed")
+            return None
+
+        if len(questions) < number_of_questions:
+            return None
+
+        self.bank_hits += 1
+        return _Response(questions=questions)
+
+    def _cached_content(self) -> Optional[str]:
+        """
+        Name of the server-side cached content holding SYSTEM_INSTRUCTION, or
+        None when there is no live one and the instruction must be sent inline.
+        Never waits on the network; see :meth:`start_context_cache`.
+        """
+        if self._context_cache is None:
+            return None
+        if self._context_cache_expires <= datetime.now(timezone.utc):
+            return None
+        return self._context_cache
+
+    async def _refresh_context_cache(self) -> float:
+        """
+        Creates the cached content, or extends the current one. Returns the
+        seconds to wait before the next refresh.
+        """
+        ttl = f"{GEMINI_CONTEXT_CACHE_TTL}s"
+        now = datetime.now(timezone.utc)
+        try:
+            name = self._cached_content()
+            if name is not None:
+                call = self.client.aio.caches.update(
+                    name=name,
+                    config=UpdateCachedContentConfig(ttl=ttl),
+                )
+            else:
+                call = self.client.aio.caches.create(
+                    model=GEMINI_MODEL,
+                    config=CreateCachedContentConfig(
+                        display_name="preploop-system-instruction",
+                        system_instruction=SYSTEM_INSTRUCTION,
+                        ttl=ttl,
+                    ),
+                )
+            cached = await asyncio.wait_for(call, GEMINI_TIMEOUT)
+        except Exception as exc:
+            log.warning(
+                "Context caching unavailable, sending the system instruction inline: %s",
+                exc,
+            )
+            self._context_cache = None
+            return GEMINI_CONTEXT_CACHE_TTL
+
+        self._context_cache = cached.name
+        self._context_cache_expires = cached.expire_time or now + timedelta(
+            seconds=GEMINI_CONTEXT_CACHE_TTL
+        )
+        # Renew once less than a tenth of the lifetime is left
+        remaining = (self._context_cache_expires - now).total_seconds()
+        return max(remaining - GEMINI_CONTEXT_CACHE_TTL / 10, 1.0)
+
+    async def _refresh_context_cache_forever(self) -> None:
+        while True:
+            await asyncio.sleep(await self._refresh_context_cache())
+
+    def start_context_cache(self) -> None:
+        """
+        Keep SYSTEM_INSTRUCTION in a server-side cached content, created and
+        extended in the background. Does nothing when GEMINI_CONTEXT_CACHE_TTL
+        is 0, or when the instruction is smaller than Gemini will cache.
+        """
+        if GEMINI_CONTEXT_CACHE_TTL <= 0:
+            return
+        if _estimated_tokens(SYSTEM_INSTRUCTION) < GEMINI_CONTEXT_CACHE_MIN_TOKENS:
+            log.info(
+                "System instruction is below GEMINI_CONTEXT_CACHE_MIN_TOKENS, "
+                "not caching it"
+            )
+            return
+        self._spawn(self._refresh_context_cache_forever())
+
+    async def _request(
+        self, number_of_questions: int, selected_topics: Tuple[str, ...]
+    ) -> Dict[str, Any]:
+        cached_content = self._cached_content()
+        return dict(
+            model=GEMINI_MODEL,
+            contents=[
+                Content(
+                    role="user",
+                    parts=[
+                        Part.from_text(text=f"Prepared topics: {selected_topics}"),
+                        Part.from_text(
+                            text=f"Total Number of questions need: {number_of_questions}"
+                        ),
+                    ],
+                )
+            ],
+            config=GenerateContentConfig(
+                cached_content=cached_content,
+                system_instruction=None if cached_content else SYSTEM_INSTRUCTION,
+                response_mime_type="application/json",
+                response_schema=_Response,
+            ),
+        )
+
+    def _record_usage(
+        self, usage: Optional[GenerateContentResponseUsageMetadata]
+    ) -> None:
+        if usage is None:
+            return
+
+        self.token_usage["prompt_tokens"] += usage.prompt_token_count or 0
+        self.token_usage["cached_tokens"] += usage.cached_content_token_count or 0
+        self.token_usage["output_tokens"] += usage.candidates_token_count or 0
+        self.token_usage["total_tokens"] += usage.total_token_count or 0
+
+    async def _generate(
+        self, number_of_questions: int, selected_topics: Tuple[str, ...]
+    ) -> _Response:
+        """
+        Generates the questions, in concurrent shards for large requests. Shards
+        that fail or come back short are topped up once; a set still short after
+        that raises, so it is never cached or banked as if it were complete.
+        """
+        seen: Set[str] = set()
+        questions: List[_Question] = []
+        error: Optional[Exception] = None
+        for _ in range(2):
+            missing = number_of_questions - len(questions)
+            if missing <= 0:
+                break
+
+            if missing <= GEMINI_SHARD_THRESHOLD:
+                shards = [(missing, selected_topics)]
             else:
-                del self._temp[selected_topics]
+                shards = self._shards(missing, selected_topics)
+            results = await asyncio.gather(
+                *(self._generate_once(size, topics) for size, topics in shards),
+                return_exceptions=True,
+            )
+
+            for result in results:
+                if isinstance(result, Exception):
+                    error = result
+                    continue
+                if isinstance(result, BaseException):
+                    raise result
+                for question in result.questions:
+                    text = " ".join(question.question.split()).casefold()
+                    if text not in seen:
+                        seen.add(text)
+                        questions.append(question)
+
+        if len(questions) < number_of_questions:
+            if not questions and error is not None:
+                raise error
+            raise _IncompleteResponse(
+                f"Generated {len(questions)} of {number_of_questions} questions"
+            ) from error
+
+        return _Response(questions=questions[:number_of_questions])
+
+    @staticmethod
+    def _shards(
+        number_of_questions: int, selected_topics: Tuple[str, ...]
+    ) -> List[Tuple[int, Tuple[str, ...]]]:
+        count = min(
+            math.ceil(number_of_questions / GEMINI_SHARD_SIZE), GEMINI_MAX_SHARDS
+        )
+        shard_size = math.ceil(number_of_questions / count)
+        count = math.ceil(number_of_questions / shard_size)
+        shards = []
+        for i in range(count):
+            size = min(shard_size, number_of_questions - i * shard_size)
+            if len(selected_topics) >= count:
+                # Enough topics to give every shard its own subset
+                topics = selected_topics[i::count]
+            else:
+                # Rotate so each shard leads with a different topic, which
+                # keeps the shards from converging on the same questions
+                offset = i % len(selected_topics) if selected_topics else 0
+                topics = selected_topics[offset:] + selected_topics[:offset]
+            shards.append((size, topics))
+
+        return shards
+
+    async def _generate_once(
+        self, number_of_questions: int, selected_topics: Tuple[str, ...]
+    ) -> _Response:
+        request = await self._request(number_of_questions, selected_topics)
+
+        async def call() -> _Response:
+            response = await self.client.aio.models.generate_content(**request)
+            self._record_usage(response.usage_metadata)
+            return _Response(**json.loads(response.text or "{}"))
+
+        # Each attempt takes its own slot in `_semaphore`, see ResilientCaller
+        return await self.resilience.call(call)
+
+    async def _fallback(
+        self, number_of_questions: int, selected_topics: Tuple[str, ...]
+    ) -> Optional[_Response]:
+        """
+        Whatever the question bank can offer while the model is failing, even
+        if it is fewer questions than requested.
+        """
+        if self.bank is None or not selected_topics:
+            return None
 
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=[
-                    Content(
-                        parts=[
-                            Part.from_text(text=f"Prepared topics: {selected_topics}"),
-                        ]
-                    )
-                ],
-                config=GenerateContentConfig(
-                    system_instruction=SYSTEM_INSTRUCTION
-                    + "\n"
-                    + f"Total Number of questions need: {number_of_questions}",
-                    response_mime_type="application/json",
-                    response_schema=_Response,
+            questions = await self.bank.sample(selected_topics, number_of_questions)
+        except Exception:
+            return None
+
+        if not questions:
+            return None
+
+        self.fallbacks += 1
+        return _Response(questions=questions)
+
+    async def _lookup(
+        self, key: Tuple, number_of_questions: int, selected_topics: Tuple[str, ...]
+    ) -> Optional[_Response]:
+        if self.bank is not None and selected_topics:
+            banked = await self._from_bank(number_of_questions, selected_topics)
+            if banked is not None:
+                return banked
+
+        self.popularity.hit(key)
+        return self.cache.get(key)
+
+    def _store(
+        self, key: Tuple, selected_topics: Tuple[str, ...], response: _Response
+    ) -> None:
+        self.cache.set(key, response)
+        if self.bank is not None and len(selected_topics) == 1:
+            self._spawn(self.bank.add(selected_topics[0], response.questions))
+
+    async def _generate_and_store(
+        self, key: Tuple, number_of_questions: int, selected_topics: Tuple[str, ...]
+    ) -> _Response:
+        # Runs once per shared generation, however many callers wait on it
+        response = await self._generate(number_of_questions, selected_topics)
+        self._store(key, selected_topics, response)
+        return response
+
+    async def generate_questions(
+        self, number_of_questions: int, *selected_topics: str
+    ) -> Optional[_Response]:
+        key = self._make_key(number_of_questions, selected_topics)
+        cached = await self._lookup(key, number_of_questions, selected_topics)
+        if cached is not None:
+            return cached
+
+        try:
+            return await self._single_flight(
+                key,
+                lambda: self._generate_and_store(
+                    key, number_of_questions, selected_topics
                 ),
             )
+        except Exception:
+            log.warning("Question generation failed for %r", key, exc_info=True)
+            return await self._fallback(number_of_questions, selected_topics)
 
-            if response:
-                response = _Response(**json.loads(response.text or "{}"))
-                self._temp[selected_topics] = (response, current_time)
-                return response
+    async def stream_questions(
+        self, number_of_questions: int, *selected_topics: str
+    ) -> AsyncIterator[_Question]:
+        """
+        Yield questions one by one as soon as each is complete in the model's
+        streamed output. The full set is cached once the stream finishes.
 
-        except Exception as e:
-            return None
+        Raises once the questions already yielded are all there will be, so a
+        failed or truncated stream is never mistaken for a complete one.
+        """
+        key = self._make_key(number_of_questions, selected_topics)
+        response = await self._lookup(key, number_of_questions, selected_topics)
+
+        if response is None and key in self._inflight:
+            # An identical generation is already running; share its result
+            response = await self.generate_questions(
+                number_of_questions, *selected_topics
+            )
+
+        if response is not None:
+            for question in response.questions:
+                yield question
+            return
+
+        breaker = self.resilience.breaker
+        if not breaker.allow():
+            response = await self._fallback(number_of_questions, selected_topics)
+            if response is None:
+                raise CircuitOpenError("Upstream is unhealthy, failing fast")
+            for question in response.questions:
+                yield question
+            return
+
+        parser = _QuestionStreamParser()
+        questions: List[_Question] = []
+        usage = None
+        settled = complete = False
+        try:
+            request = await self._request(number_of_questions, selected_topics)
+            async with self._semaphore:
+                self.issued_calls += 1
+                stream = await self.client.aio.models.generate_content_stream(**request)
+                chunks = stream.__aiter__()
+                while True:
+                    # The deadline applies per chunk so a hung stream is abandoned
+                    try:
+                        chunk = await asyncio.wait_for(
+                            chunks.__anext__(), self.resilience.timeout
+                        )
+                    except StopAsyncIteration:
+                        break
+
+                    # Usage totals are reported on the final chunk
+                    usage = chunk.usage_metadata or usage
+                    for question in parser.feed(chunk.text or ""):
+                        questions.append(question)
+                        yield question
+        except Exception as exc:
+            if _is_retryable(exc):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            settled = True
+            log.exception("Streaming question generation failed")
+            raise
+        else:
+            complete = len(questions) >= number_of_questions
+            if complete:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            settled = True
+        finally:
+            # The client went away mid-stream; upstream health is unknown
+            if not settled:
+                breaker.release()
+
+        self._record_usage(usage)
+        if not complete:
+            # Truncated or unparseable output must not be served from cache
+            log.warning(
+                "Streamed %d of %d questions for %r",
+                len(questions),
+                number_of_questions,
+                key,
+            )
+            raise _IncompleteResponse(
+                f"Streamed {len(questions)} of {number_of_questions} questions"
+            )
 
-        return None
+        self._store(key, selected_topics, _Response(questions=questions))
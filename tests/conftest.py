@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+# src reads its configuration at import time; nothing here talks to Mongo or SMTP
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MAIL", "preploop@example.com")
+os.environ.setdefault("PASS", "password")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
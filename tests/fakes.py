@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import re
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from google.genai import errors as genai_errors
+from pymongo.errors import BulkWriteError
+
+from src.utils import GoogleGenerativeAIHandler
+
+
+def _requested(request: Any) -> int:
+    """The number of questions a generate_content request asks for."""
+    text = " ".join(part.text for part in request["contents"][0].parts)
+    match = re.search(r"questions need: (\d+)", text)
+    return int(match.group(1)) if match else 0
+
+
+def questions_json(count: int, *, prefix: str = "Question") -> str:
+    questions = [
+        {"question": f"{prefix} {i}?", "correct_answer": f"Answer {i}."}
+        for i in range(count)
+    ]
+    return json.dumps({"questions": questions})
+
+
+def rejected() -> genai_errors.ClientError:
+    # Not retryable, so each error fails exactly one shard
+    return genai_errors.ClientError(400, {"error": {"message": "rejected"}})
+
+
+class FakeModels:
+    """
+    Stands in for `client.aio.models`. Each call waits `delay` seconds, then
+    raises the next exception from `errors` if any are left, else answers with
+    as many questions as were asked for.
+    """
+
+    def __init__(self, *, delay: float = 0.0, errors: Optional[List[Exception]] = None):
+        self.delay = delay
+        self.errors = list(errors or [])
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        # Raw text chunks for generate_content_stream; None streams a full answer
+        self.stream_chunks: Optional[List[str]] = None
+        # Seconds to hang after the stream chunks, e.g. to simulate a stall
+        self.stream_stall = 0.0
+
+    async def generate_content(self, **request: Any) -> SimpleNamespace:
+        self.calls += 1
+        call = self.calls
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.errors:
+                raise self.errors.pop(0)
+            return SimpleNamespace(
+                # Distinct per call, so shards are not deduplicated away
+                text=questions_json(_requested(request), prefix=f"Call {call}:"),
+                usage_metadata=None,
+            )
+        finally:
+            self.active -= 1
+
+    async def generate_content_stream(self, **request: Any) -> AsyncIterator[Any]:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+        chunks = self.stream_chunks
+        if chunks is None:
+            text = questions_json(_requested(request), prefix=f"Call {self.calls}:")
+            chunks = [text[i : i + 40] for i in range(0, len(text), 40)]
+
+        async def stream() -> AsyncIterator[SimpleNamespace]:
+            for chunk in chunks:
+                await asyncio.sleep(self.delay)
+                yield SimpleNamespace(text=chunk, usage_metadata=None)
+            if self.stream_stall:
+                await asyncio.sleep(self.stream_stall)
+
+        return stream()
+
+
+class FakeCaches:
+    """
+    Stands in for `client.aio.caches`. Every call raises `error` if given,
+    else returns a cached content with no expiry time.
+    """
+
+    def __init__(self, error: Optional[Exception] = None):
+        self.error = error
+        self.created = 0
+        self.updated = 0
+
+    def _answer(self) -> SimpleNamespace:
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(name="cachedContents/fake", expire_time=None)
+
+    async def create(self, **kwargs: Any) -> SimpleNamespace:
+        self.created += 1
+        return self._answer()
+
+    async def update(self, **kwargs: Any) -> SimpleNamespace:
+        self.updated += 1
+        return self._answer()
+
+
+class FakeClient:
+    def __init__(
+        self, models: Optional[FakeModels] = None, caches: Optional[FakeCaches] = None
+    ):
+        self.aio = SimpleNamespace(
+            models=models or FakeModels(),
+            caches=caches or FakeCaches(),
+            aclose=self._aclose,
+        )
+
+    async def _aclose(self) -> None:
+        pass
+
+
+def make_handler(
+    models: FakeModels, caches: Optional[FakeCaches] = None, **kwargs
+) -> GoogleGenerativeAIHandler:
+    handler = GoogleGenerativeAIHandler(**kwargs)
+    handler.client = FakeClient(models, caches)  # type: ignore[assignment]
+    handler.resilience.backoff_base = 0
+    return handler
+
+
+class FakeCursor:
+    def __init__(self, documents: Iterable[Dict[str, Any]]):
+        self.documents = list(documents)
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        for document in self.documents:
+            yield document
+
+
+class FakeQuestionCollection:
+    """
+    Stands in for the `questions` collection, understanding just the
+    pipelines QuestionBank runs.
+    """
+
+    def __init__(self):
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.pipelines: List[List[Dict[str, Any]]] = []
+        self.inserts = 0
+
+    async def aggregate(self, pipeline: List[Dict[str, Any]]) -> FakeCursor:
+        self.pipelines.append(pipeline)
+        documents = list(self.documents.values())
+        for stage in pipeline:
+            [(operator, argument)] = stage.items()
+            if operator == "$match":
+                topic = argument["topic"]
+                topics = topic["$in"] if isinstance(topic, dict) else [topic]
+                documents = [d for d in documents if d["topic"] in topics]
+            elif operator == "$group":
+                counts = Counter(d["topic"] for d in documents)
+                documents = [{"_id": t, "count": n} for t, n in counts.items()]
+            elif operator == "$sample":
+                size = min(argument["size"], len(documents))
+                documents = random.sample(documents, size)
+            elif operator == "$project":
+                documents = [
+                    {key: d[key] for key, keep in argument.items() if keep}
+                    for d in documents
+                ]
+        return FakeCursor(documents)
+
+    async def insert_many(
+        self, documents: List[Dict[str, Any]], ordered: bool = True
+    ) -> SimpleNamespace:
+        self.inserts += 1
+        inserted = [d["_id"] for d in documents if d["_id"] not in self.documents]
+        for document in documents:
+            self.documents.setdefault(document["_id"], document)
+        if len(inserted) < len(documents):
+            raise BulkWriteError({"nInserted": len(inserted), "writeErrors": []})
+        return SimpleNamespace(inserted_ids=inserted)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pytest
+
+from src import cache
+from src.cache import DecayedCounter, TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(cache, "monotonic", clock)
+    return clock
+
+
+def test_scores_halve_every_half_life(clock: Clock):
+    counter: DecayedCounter[str] = DecayedCounter(half_life=10)
+    counter.hit("a")
+    counter.hit("a")
+
+    clock.now += 10
+    assert counter.score("a") == pytest.approx(1.0)
+
+    counter.hit("a")
+    clock.now += 20
+    assert counter.score("a") == pytest.approx(0.5)
+    assert counter.score("unknown") == 0.0
+
+
+def test_top_prefers_recent_hits(clock: Clock):
+    counter: DecayedCounter[str] = DecayedCounter(half_life=10)
+    for _ in range(4):
+        counter.hit("old")
+    clock.now += 30
+    for _ in range(2):
+        counter.hit("new")
+
+    assert [key for key, _ in counter.top(2)] == ["new", "old"]
+    assert counter.top(1)[0][1] == pytest.approx(2.0)
+
+
+def test_coldest_keys_are_pruned(clock: Clock):
+    counter: DecayedCounter[int] = DecayedCounter(maxsize=4)
+    for key in range(4):
+        counter.hit(key, weight=key + 1)
+    counter.hit(99, weight=10)
+
+    assert len(counter) <= 4
+    assert counter.score(99) == pytest.approx(10)
+    assert counter.score(0) == 0.0
+
+
+def test_ttl_cache_expires_entries(clock: Clock):
+    entries: TTLCache[str] = TTLCache(ttl=5)
+    entries.set("a", "value")
+
+    assert entries.ttl_remaining("a") == pytest.approx(5)
+    clock.now += 5
+    assert entries.get("a") is None
+    assert entries.stats()["expirations"] == 1
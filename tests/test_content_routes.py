@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.routes import content as content_routes
+from src.utils import QUESTION_MAX_COUNT
+
+from .fakes import FakeModels, make_handler, rejected
+
+
+@pytest.fixture
+def client() -> TestClient:
+    # Not used as a context manager, so startup hooks do not run
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("count", [0, -1, QUESTION_MAX_COUNT + 1])
+def test_questions_rejects_out_of_range_counts(client: TestClient, count: int):
+    body = {"number_of_questions": count, "selected_topics": ["trees"]}
+
+    assert client.post("/content/questions", json=body).status_code == 422
+    assert client.post("/content/questions/stream", json=body).status_code == 422
+
+
+def test_batch_rejects_out_of_range_counts(client: TestClient):
+    item = {"subject": "DSA", "number_of_questions": QUESTION_MAX_COUNT + 1}
+
+    response = client.post("/content/questions/batch", json={"items": [item]})
+
+    assert response.status_code == 422
+
+
+@pytest.fixture
+def models(monkeypatch) -> FakeModels:
+    models = FakeModels()
+    monkeypatch.setattr(content_routes, "genai", make_handler(models))
+    return models
+
+
+def stream_lines(client: TestClient, count: int) -> List[dict]:
+    body = {"number_of_questions": count, "selected_topics": ["trees"]}
+    response = client.post("/content/questions/stream", json=body)
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_complete_stream_has_no_error_line(client: TestClient, models: FakeModels):
+    lines = stream_lines(client, 4)
+
+    assert len(lines) == 4
+    assert all("question" in line for line in lines)
+
+
+def test_truncated_stream_ends_with_error_line(client: TestClient, models: FakeModels):
+    models.stream_chunks = [
+        '{"questions": [{"question": "A?", "correct_answer": "B."}, {"qu'
+    ]
+
+    lines = stream_lines(client, 10)
+
+    assert lines[0]["question"] == "A?"
+    assert lines[1:] == [{"error": "Failed to generate questions"}]
+
+
+def test_failed_stream_ends_with_error_line(client: TestClient, models: FakeModels):
+    models.errors.append(rejected())
+
+    assert stream_lines(client, 4) == [{"error": "Failed to generate questions"}]
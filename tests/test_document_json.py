@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+from bson import Binary, ObjectId
+
+from src.document_json import DocumentWriter
+
+
+def test_writes_object_ids_and_utc_dates():
+    _id = ObjectId()
+    writer = DocumentWriter(rename={"_id": "id"}, exclude={"user_id"})
+    document = {
+        "_id": _id,
+        "user_id": "user",
+        "start_date": datetime(2024, 1, 1, tzinfo=timezone.utc),
+    }
+
+    assert orjson.loads(writer.dumps_document(document)) == {
+        "id": str(_id),
+        "start_date": "2024-01-01T00:00:00Z",
+    }
+
+
+@pytest.mark.parametrize("value", [b"\x00\x01", Binary(b"\x00\x01"), {1, 2}])
+def test_refuses_values_without_a_json_form(value: object):
+    writer = DocumentWriter()
+
+    with pytest.raises(TypeError):
+        writer.dumps_document({"_id": "x", "value": value})
+    with pytest.raises(TypeError):
+        writer.dumps_page([{"_id": "x", "value": value}], None)
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+import pytest
+from google.genai import errors as genai_errors
+
+from src import utils
+from src.question_bank import QuestionBank
+from src.resilience import CircuitBreaker
+from src.utils import GEMINI_MAX_SHARDS, GoogleGenerativeAIHandler, _Question
+
+from .fakes import (
+    FakeCaches,
+    FakeModels,
+    FakeQuestionCollection,
+    make_handler,
+    rejected,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_queueing_does_not_count_against_deadline():
+    models = FakeModels(delay=0.06)
+    handler = make_handler(models, max_concurrency=1)
+    handler.resilience.timeout = 0.1
+
+    # Each call fits the deadline, but not after waiting for the one before
+    responses = await asyncio.gather(
+        *(handler.generate_questions(3, f"topic {i}") for i in range(3))
+    )
+
+    assert all(response is not None for response in responses)
+    assert models.max_active == 1
+    assert handler.resilience.timeouts == 0
+    assert handler.resilience.breaker.failures == 0
+
+
+async def test_hedges_and_retries_stay_within_concurrency():
+    models = FakeModels(delay=0.05)
+    models.errors.extend(genai_errors.ServerError(503, {}) for _ in range(2))
+    handler = make_handler(models, max_concurrency=2)
+    handler.resilience.hedge = True
+    for _ in range(handler.resilience.latency.min_samples):
+        handler.resilience.latency.record(0.01)
+
+    responses = await asyncio.gather(
+        *(handler.generate_questions(3, f"topic {i}") for i in range(4))
+    )
+
+    assert all(response is not None for response in responses)
+    assert models.max_active == 2
+
+
+async def open_breaker(handler: GoogleGenerativeAIHandler) -> None:
+    breaker = handler.resilience.breaker
+    breaker.state = CircuitBreaker.OPEN
+    breaker.opened_at = 0.0
+
+
+async def test_abandoned_stream_releases_breaker_trial():
+    models = FakeModels()
+    models.stream_chunks = ['{"questions": [{"question": "A?", "correct_answer": "B."}']
+    models.stream_stall = 10.0
+    handler = make_handler(models)
+    await open_breaker(handler)
+
+    stream = handler.stream_questions(5, "trees")
+    first = await stream.__anext__()
+    assert first.question == "A?"
+    assert handler.resilience.breaker.state == CircuitBreaker.HALF_OPEN
+
+    # The client disconnects while the model is still producing
+    await stream.aclose()  # type: ignore[attr-defined]
+
+    assert handler.resilience.breaker.state != CircuitBreaker.HALF_OPEN
+    assert await handler.generate_questions(2, "graphs") is not None
+    assert handler.resilience.breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_truncated_stream_is_not_cached():
+    models = FakeModels()
+    # Cut off after the first of the ten questions asked for
+    models.stream_chunks = [
+        '{"questions": [{"question": "A?", "correct_answer": "B."}, {"qu'
+    ]
+    handler = make_handler(models)
+
+    stream = handler.stream_questions(10, "trees")
+    first = await stream.__anext__()
+    with pytest.raises(utils._IncompleteResponse):
+        await stream.__anext__()
+
+    assert first.question == "A?"
+    assert len(handler.cache) == 0
+    assert handler.resilience.breaker.failures == 1
+
+    # The next request generates a full set instead of serving the partial one
+    response = await handler.generate_questions(10, "trees")
+    assert response is not None
+    assert len(response.questions) == 10
+
+
+async def test_complete_stream_is_cached():
+    handler = make_handler(FakeModels())
+
+    streamed = [question async for question in handler.stream_questions(4, "trees")]
+
+    assert len(streamed) == 4
+    assert len(handler.cache) == 1
+    assert handler.resilience.breaker.failures == 0
+
+
+async def test_failed_shards_are_topped_up():
+    models = FakeModels(errors=[rejected() for _ in range(5)])
+    handler = make_handler(models)
+
+    response = await handler.generate_questions(30, "trees")
+
+    assert response is not None
+    assert len(response.questions) == 30
+    assert len(handler.cache) == 1
+
+
+async def test_short_sharded_set_is_not_cached():
+    # Every shard of the first round and all but one of the top-up fail
+    models = FakeModels(errors=[rejected() for _ in range(11)])
+    handler = make_handler(models)
+
+    assert await handler.generate_questions(30, "trees") is None
+    assert len(handler.cache) == 0
+
+    calls = models.calls
+    response = await handler.generate_questions(30, "trees")
+    assert response is not None
+    assert len(response.questions) == 30
+    assert models.calls > calls
+
+
+@pytest.mark.parametrize("count", [11, 16, 21, 40, 1000])
+def test_shards_are_capped_and_cover_the_request(count: int):
+    shards = GoogleGenerativeAIHandler._shards(count, ("trees", "graphs"))
+
+    assert len(shards) <= GEMINI_MAX_SHARDS
+    assert sum(size for size, _ in shards) == count
+    assert all(size > 0 for size, _ in shards)
+
+
+@pytest.fixture
+def context_cache_enabled(monkeypatch):
+    monkeypatch.setattr(utils, "GEMINI_CONTEXT_CACHE_TTL", 3600)
+    monkeypatch.setattr(utils, "GEMINI_CONTEXT_CACHE_MIN_TOKENS", 0)
+
+
+async def test_context_cache_is_off_by_default():
+    caches = FakeCaches()
+    handler = make_handler(FakeModels(), caches)
+    handler.start_context_cache()
+
+    assert await handler.generate_questions(2, "trees") is not None
+    assert not handler._background
+    assert caches.created == 0
+
+
+async def test_context_cache_skips_small_instructions(monkeypatch):
+    monkeypatch.setattr(utils, "GEMINI_CONTEXT_CACHE_TTL", 3600)
+    handler = make_handler(FakeModels(), FakeCaches())
+    handler.start_context_cache()
+
+    # The instruction is well below Gemini's minimum cacheable size
+    assert not handler._background
+
+
+async def test_requests_never_create_the_context_cache(context_cache_enabled):
+    caches = FakeCaches()
+    handler = make_handler(FakeModels(), caches)
+
+    assert await handler.generate_questions(2, "trees") is not None
+    assert caches.created == 0
+
+
+async def test_refreshed_context_cache_is_used(context_cache_enabled):
+    caches = FakeCaches()
+    handler = make_handler(FakeModels(), caches)
+
+    delay = await handler._refresh_context_cache()
+    request = await handler._request(2, ("trees",))
+
+    assert delay == pytest.approx(3240, abs=1)
+    assert request["config"].cached_content == "cachedContents/fake"
+    assert request["config"].system_instruction is None
+
+    await handler._refresh_context_cache()
+    assert (caches.created, caches.updated) == (1, 1)
+
+
+async def test_failed_context_cache_falls_back_inline(context_cache_enabled):
+    handler = make_handler(FakeModels(), FakeCaches(RuntimeError("too small")))
+
+    delay = await handler._refresh_context_cache()
+    request = await handler._request(2, ("trees",))
+
+    assert delay == 3600
+    assert request["config"].cached_content is None
+    assert request["config"].system_instruction == utils.SYSTEM_INSTRUCTION
+
+
+def banked(prefix: str, count: int):
+    return [
+        _Question(question=f"{prefix} {i}?", correct_answer="A.") for i in range(count)
+    ]
+
+
+async def test_bank_serves_only_when_every_topic_is_covered(monkeypatch):
+    # No background replenishing, so only the request itself calls the model
+    monkeypatch.setattr(utils, "QUESTION_BANK_MIN_PER_TOPIC", 0)
+    bank = QuestionBank(FakeQuestionCollection())  # type: ignore[arg-type]
+    await bank.add("OS", banked("OS", 20))
+    models = FakeModels()
+    handler = make_handler(models, bank=bank)
+
+    # DBMS has nothing banked, so the set is generated instead
+    response = await handler.generate_questions(10, "OS", "DBMS")
+    assert response is not None
+    assert handler.bank_hits == 0
+    assert models.calls == 1
+
+    await bank.add("DBMS", banked("DB", 20))
+    response = await handler.generate_questions(10, "OS", "DBMS")
+    assert response is not None
+    assert handler.bank_hits == 1
+    assert sum(q.question.startswith("DB") for q in response.questions) == 5
+
+
+async def test_identical_requests_share_one_generation_and_one_store(monkeypatch):
+    monkeypatch.setattr(utils, "QUESTION_BANK_MIN_PER_TOPIC", 0)
+    collection = FakeQuestionCollection()
+    models = FakeModels(delay=0.02)
+    handler = make_handler(models, bank=QuestionBank(collection))  # type: ignore[arg-type]
+    stores = []
+    monkeypatch.setattr(
+        handler.cache, "set", lambda *args, **kwargs: stores.append(args)
+    )
+
+    responses = await asyncio.gather(
+        *(handler.generate_questions(4, "trees") for _ in range(10))
+    )
+    await asyncio.gather(*handler._background)
+
+    assert all(response is responses[0] for response in responses)
+    assert models.calls == 1
+    assert (handler.issued_calls, handler.coalesced_calls) == (1, 9)
+    assert len(stores) == 1
+    assert collection.inserts == 1
+
+
+async def test_shared_failure_reaches_every_waiter_uncached():
+    # Fails the call and its top-up
+    models = FakeModels(delay=0.02, errors=[rejected(), rejected()])
+    handler = make_handler(models)
+
+    responses = await asyncio.gather(
+        *(handler.generate_questions(4, "trees") for _ in range(5))
+    )
+
+    assert responses == [None] * 5
+    assert models.calls == 2
+    assert len(handler.cache) == 0
+
+    # The failure was not cached, so the next request tries again
+    assert await handler.generate_questions(4, "trees") is not None
+    assert models.calls == 3
+
+
+def test_prewarm_budget_counts_model_calls(monkeypatch):
+    monkeypatch.setattr(utils, "PREWARM_MIN_SCORE", 1)
+    handler = make_handler(FakeModels())
+    # Hottest first: a 40-question set takes 8 shards, the small ones 1 call
+    for key, hits in [((40, "trees"), 5), ((5, "graphs"), 4), ((5, "heaps"), 3)]:
+        for _ in range(hits):
+            handler.popularity.hit(key)
+
+    assert handler._due_for_prewarm(8) == [(40, "trees")]
+    assert handler._due_for_prewarm(7) == [(5, "graphs"), (5, "heaps")]
+    assert handler._due_for_prewarm(1) == [(5, "graphs")]
+
+
+def test_prewarm_skips_fresh_and_cold_keys(monkeypatch):
+    monkeypatch.setattr(utils, "PREWARM_MIN_SCORE", 2)
+    handler = make_handler(FakeModels())
+    for _ in range(3):
+        handler.popularity.hit((5, "fresh"))
+        handler.popularity.hit((5, "stale"))
+    handler.popularity.hit((5, "cold"))
+    handler.cache.set((5, "fresh"), utils._Response(questions=[]))
+
+    assert handler._due_for_prewarm(10) == [(5, "stale")]
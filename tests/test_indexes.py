@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import List
+
+import pytest
+from pymongo import IndexModel
+
+from src.indexes import IndexManager
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeCollection:
+    def __init__(self, fail: bool):
+        self.fail = fail
+
+    async def create_indexes(self, models: List[IndexModel]) -> List[str]:
+        if self.fail:
+            raise RuntimeError("index build failed")
+        return [model.document["name"] for model in models]
+
+
+class FakeDatabase:
+    def __init__(self, failing: List[str]):
+        self.failing = failing
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return FakeCollection(name in self.failing)
+
+
+async def test_built_indexes_are_ready():
+    manager = IndexManager(FakeDatabase([]))  # type: ignore[arg-type]
+    assert not manager.is_ready("email_unique")
+
+    await manager.ensure()
+
+    assert manager.is_ready("email_unique")
+    assert manager.is_ready("topic")
+
+
+async def test_failed_indexes_are_not_ready():
+    manager = IndexManager(FakeDatabase(["users"]))  # type: ignore[arg-type]
+
+    await manager.ensure()
+
+    assert not manager.is_ready("email_unique")
+    assert manager.is_ready("topic")
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from src import otp as otp_module
+from src.otp import MongoOTPHandler, OTPHandler, OTPThrottled
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(otp_module, "monotonic", clock)
+    return clock
+
+
+def _compare(value: Any, condition: Any) -> bool:
+    if not isinstance(condition, dict):
+        return value == condition
+    if value is None:
+        return False
+    checks = {
+        "$lt": lambda bound: value < bound,
+        "$lte": lambda bound: value <= bound,
+        "$gt": lambda bound: value > bound,
+    }
+    return all(checks[op](bound) for op, bound in condition.items())
+
+
+class FakeOTPCollection:
+    """Just enough of a collection for MongoOTPHandler, upsert collisions included."""
+
+    def __init__(self):
+        self.documents: Dict[str, Dict[str, Any]] = {}
+
+    def _find(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        document = self.documents.get(query["_id"])
+        if document is not None and all(
+            _compare(document.get(key), condition) for key, condition in query.items()
+        ):
+            return document
+        return None
+
+    async def update_one(
+        self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False
+    ) -> None:
+        document = self._find(query)
+        if document is None:
+            if not upsert:
+                return
+            if query["_id"] in self.documents:
+                raise DuplicateKeyError("E11000 duplicate key error")
+            document = self.documents[query["_id"]] = {"_id": query["_id"]}
+
+        document.update(update.get("$set", {}))
+        for key, amount in update.get("$inc", {}).items():
+            document[key] = document.get(key, 0) + amount
+
+    async def find_one_and_delete(
+        self, query: Dict[str, Any], projection: Any = None
+    ) -> Optional[Dict[str, Any]]:
+        document = self._find(query)
+        if document is None:
+            return None
+        del self.documents[document["_id"]]
+        return {"_id": document["_id"]}
+
+    async def delete_one(self, query: Dict[str, Any]) -> None:
+        if self._find(query) is not None:
+            del self.documents[query["_id"]]
+
+
+@pytest.fixture(params=["memory", "mongo"])
+def handler(request, clock: Clock):
+    options = dict(ttl=60, max_attempts=3, min_interval=30)
+    if request.param == "memory":
+        return OTPHandler(**options)
+    return MongoOTPHandler(FakeOTPCollection(), **options)  # type: ignore[arg-type]
+
+
+async def test_code_is_consumed_by_first_validation(handler):
+    code = await handler.generate_otp(email="a@example.com")
+
+    assert not await handler.validate_otp(email="b@example.com", otp=code)
+    assert await handler.validate_otp(email="a@example.com", otp=code)
+    assert not await handler.validate_otp(email="a@example.com", otp=code)
+
+
+async def test_code_locks_after_max_attempts(handler):
+    code = await handler.generate_otp(email="a@example.com")
+    wrong = code + 1 if code < 999_999 else code - 1
+
+    for _ in range(3):
+        assert not await handler.validate_otp(email="a@example.com", otp=wrong)
+
+    assert not await handler.validate_otp(email="a@example.com", otp=code)
+
+
+async def test_new_code_is_throttled(handler):
+    await handler.generate_otp(email="a@example.com")
+
+    with pytest.raises(OTPThrottled):
+        await handler.generate_otp(email="a@example.com")
+
+    # Other emails are not affected
+    await handler.generate_otp(email="b@example.com")
+
+
+async def test_revoked_code_does_not_throttle(handler):
+    code = await handler.generate_otp(email="a@example.com")
+    await handler.revoke_otp(email="a@example.com", otp=code)
+
+    assert not await handler.validate_otp(email="a@example.com", otp=code)
+    await handler.generate_otp(email="a@example.com")
+
+
+async def test_revoke_leaves_a_newer_code(handler):
+    code = await handler.generate_otp(email="a@example.com")
+    await handler.revoke_otp(email="a@example.com", otp=code + 1)
+
+    assert await handler.validate_otp(email="a@example.com", otp=code)
+
+
+async def test_memory_codes_expire_in_deadline_order(clock: Clock):
+    handler = OTPHandler(ttl=60, min_interval=0)
+    first = await handler.generate_otp(email="a@example.com")
+    clock.now += 30
+    second = await handler.generate_otp(email="b@example.com")
+
+    clock.now += 30
+    assert not await handler.validate_otp(email="a@example.com", otp=first)
+    assert "a@example.com" not in handler.lru
+    assert await handler.validate_otp(email="b@example.com", otp=second)
+
+
+async def test_memory_reissued_code_outlives_the_old_deadline(clock: Clock):
+    handler = OTPHandler(ttl=60, min_interval=10)
+    await handler.generate_otp(email="a@example.com")
+    clock.now += 30
+    code = await handler.generate_otp(email="a@example.com")
+
+    # The first code's deadline passes, but it was superseded
+    clock.now += 40
+    assert await handler.validate_otp(email="a@example.com", otp=code)
+
+
+async def test_mongo_expired_code_is_rejected():
+    collection = FakeOTPCollection()
+    handler = MongoOTPHandler(collection, ttl=60, min_interval=30)  # type: ignore[arg-type]
+    code = await handler.generate_otp(email="a@example.com")
+    # Past its expiry, but not yet removed by the TTL monitor
+    collection.documents["a@example.com"]["expires_at"] = datetime.now(
+        timezone.utc
+    ) - timedelta(seconds=1)
+
+    assert not await handler.validate_otp(email="a@example.com", otp=code)
+
+
+async def test_mongo_code_can_be_reissued_after_the_interval():
+    collection = FakeOTPCollection()
+    handler = MongoOTPHandler(collection, ttl=60, min_interval=30)  # type: ignore[arg-type]
+    await handler.generate_otp(email="a@example.com")
+    collection.documents["a@example.com"]["issued_at"] -= timedelta(seconds=31)
+
+    code = await handler.generate_otp(email="a@example.com")
+
+    assert collection.documents["a@example.com"]["attempts"] == 0
+    assert await handler.validate_otp(email="a@example.com", otp=code)
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import pytest
+
+from src.question_bank import QuestionBank
+from src.utils import _Question
+
+from .fakes import FakeQuestionCollection
+
+pytestmark = pytest.mark.anyio
+
+
+def questions(topic: str, count: int):
+    return [
+        _Question(question=f"{topic} question {i}?", correct_answer="Answer.")
+        for i in range(count)
+    ]
+
+
+def test_quotas_split_evenly():
+    assert QuestionBank.quotas(["OS", "dbms", " os "], 5) == {"dbms": 3, "os": 2}
+    assert QuestionBank.quotas(["OS"], 4) == {"os": 4}
+
+
+async def test_add_skips_duplicates_and_refreshes_counts():
+    bank = QuestionBank(FakeQuestionCollection())  # type: ignore[arg-type]
+
+    assert await bank.counts(["OS"]) == {"os": 0}
+    assert await bank.add("OS", questions("OS", 3)) == 3
+    assert await bank.add("os", questions("OS", 4)) == 1
+    assert await bank.counts(["OS", "DBMS"]) == {"os": 4, "dbms": 0}
+
+
+async def test_counts_are_cached():
+    collection = FakeQuestionCollection()
+    bank = QuestionBank(collection)  # type: ignore[arg-type]
+
+    await bank.counts(["OS"])
+    await bank.counts(["OS"])
+
+    assert len(collection.pipelines) == 1
+
+
+async def test_sample_takes_a_share_from_every_topic():
+    bank = QuestionBank(FakeQuestionCollection())  # type: ignore[arg-type]
+    await bank.add("OS", questions("OS", 20))
+    await bank.add("DBMS", questions("DBMS", 20))
+
+    sampled = await bank.sample(["OS", "DBMS"], 10)
+
+    assert len(sampled) == 10
+    assert sum(q.question.startswith("OS") for q in sampled) == 5
+    assert sum(q.question.startswith("DBMS") for q in sampled) == 5
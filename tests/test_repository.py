@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import bson
+import pytest
+
+from src.models import Interview
+from src.repository import WITHOUT_HISTORY, InterviewRepository, _projection
+from src.responses import model_response
+from src.routes.user import INTERVIEW_JSON, InterviewPage
+
+pytestmark = pytest.mark.anyio
+
+
+def _matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(document, branch) for branch in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not document[key] < condition["$lt"]:
+                return False
+        elif document[key] != condition:
+            return False
+    return True
+
+
+class FakeFindCursor:
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self.documents = documents
+
+    def sort(self, keys: List[Any]) -> "FakeFindCursor":
+        # Only descending sorts are used
+        self.documents.sort(key=lambda d: [d[key] for key, _ in keys], reverse=True)
+        return self
+
+    def limit(self, count: int) -> "FakeFindCursor":
+        self.documents = self.documents[:count]
+        return self
+
+    async def to_list(self) -> List[Dict[str, Any]]:
+        return self.documents
+
+
+class FakeCollection:
+    def __init__(self, documents: Optional[List[Dict[str, Any]]] = None):
+        self.documents = documents or []
+
+    def with_options(self, codec_options: Any) -> "FakeCollection":
+        self.codec_options = codec_options
+        return self
+
+    def find(self, query: Dict[str, Any]) -> FakeFindCursor:
+        return FakeFindCursor([d for d in self.documents if _matches(d, query)])
+
+
+def round_trip(repository: InterviewRepository, interview: Interview) -> Dict:
+    """What reading the interview back from Mongo yields."""
+    document = repository.to_document("user", interview)
+    options = repository.collection.codec_options
+    return bson.decode(bson.encode(document), codec_options=options)
+
+
+def make_interview() -> Interview:
+    start = datetime(
+        2024, 1, 1, 10, 0, 0, 123456, tzinfo=timezone(timedelta(hours=5, minutes=30))
+    )
+    return Interview(subject="DSA", questions=[], start_date=start, end_date=start)
+
+
+def test_interview_dates_read_back_as_utc():
+    repository = InterviewRepository(FakeCollection())  # type: ignore[arg-type]
+    interview = make_interview()
+
+    stored = repository.from_document(round_trip(repository, interview))
+
+    # Same instant, to BSON's millisecond precision
+    assert abs(stored.start_date - interview.start_date) < timedelta(milliseconds=1)
+    assert stored.model_dump(mode="json")["start_date"] == "2024-01-01T04:30:00.123000Z"
+
+
+def test_raw_history_page_matches_validated_page():
+    repository = InterviewRepository(FakeCollection())  # type: ignore[arg-type]
+    documents = [round_trip(repository, make_interview()) for _ in range(3)]
+
+    validated = model_response(
+        InterviewPage(items=repository.from_documents(documents), next_cursor="c")
+    ).body
+    raw = INTERVIEW_JSON.dumps_page(documents, "c")
+
+    assert raw == validated
+
+
+def test_projection_never_returns_history():
+    assert _projection(None) == WITHOUT_HISTORY
+    # Empty projections would mean "everything"
+    assert _projection([]) == WITHOUT_HISTORY
+    assert _projection(["history"]) == {"_id": 1}
+    assert _projection(["email", "history"]) == {"_id": 1, "email": 1}
+
+
+async def test_pages_cover_history_once_newest_first():
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    documents = [
+        # Pairs share a start date, so pages must break ties by id
+        {
+            "_id": f"i{n}",
+            "user_id": "user",
+            "start_date": start + timedelta(days=n // 2),
+        }
+        for n in range(7)
+    ]
+    other = {"_id": "x", "user_id": "other", "start_date": start}
+    repository = InterviewRepository(
+        FakeCollection(documents + [other])  # type: ignore[arg-type]
+    )
+
+    seen: List[str] = []
+    cursor = None
+    while True:
+        page, cursor = await repository.page_documents_for_user(
+            "user", limit=2, cursor=cursor
+        )
+        seen.extend(document["_id"] for document in page)
+        if cursor is None:
+            break
+
+    assert seen == [f"i{n}" for n in reversed(range(7))]
+
+
+async def test_last_full_page_has_no_cursor():
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    documents = [
+        {"_id": f"i{n}", "user_id": "user", "start_date": start} for n in range(2)
+    ]
+    repository = InterviewRepository(FakeCollection(documents))  # type: ignore[arg-type]
+
+    page, cursor = await repository.page_documents_for_user("user", limit=2)
+
+    assert len(page) == 2
+    assert cursor is None
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", "WzFd", "bnVsbA=="])
+async def test_malformed_cursor_raises_value_error(cursor: str):
+    repository = InterviewRepository(FakeCollection())  # type: ignore[arg-type]
+
+    with pytest.raises(ValueError):
+        await repository.page_documents_for_user("user", limit=2, cursor=cursor)
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from src.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
+
+pytestmark = pytest.mark.anyio
+
+
+class Retryable(Exception):
+    pass
+
+
+class Fatal(Exception):
+    pass
+
+
+class FakeUpstream:
+    """
+    Plays back a script of outcomes, one per call: a delay in seconds, or an
+    exception to raise. Calls past the end of the script succeed at once.
+    """
+
+    def __init__(self, *script: object):
+        self.script: List[object] = list(script)
+        self.calls = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        step: Optional[object] = self.script.pop(0) if self.script else None
+        if isinstance(step, BaseException):
+            raise step
+        if isinstance(step, (int, float)):
+            await asyncio.sleep(step)
+        return "ok"
+
+
+def make_caller(**kwargs) -> ResilientCaller:
+    kwargs.setdefault("backoff_base", 0)
+    kwargs.setdefault(
+        "retryable", lambda exc: isinstance(exc, (Retryable, asyncio.TimeoutError))
+    )
+    return ResilientCaller(**kwargs)
+
+
+async def test_deadline_abandons_slow_attempt():
+    caller = make_caller(timeout=0.05, retries=0)
+    upstream = FakeUpstream(1.0)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await caller.call(upstream)
+
+    assert caller.timeouts == 1
+
+
+async def test_retries_retryable_errors():
+    caller = make_caller(retries=2)
+    upstream = FakeUpstream(Retryable(), Retryable())
+
+    assert await caller.call(upstream) == "ok"
+    assert upstream.calls == 3
+    assert caller.retried == 2
+    assert caller.breaker.failures == 0
+
+
+async def test_gives_up_after_retries():
+    caller = make_caller(retries=1)
+    upstream = FakeUpstream(Retryable(), Retryable(), Retryable())
+
+    with pytest.raises(Retryable):
+        await caller.call(upstream)
+
+    assert upstream.calls == 2
+    assert caller.breaker.failures == 1
+
+
+async def test_does_not_retry_fatal_errors():
+    caller = make_caller(retries=2)
+    upstream = FakeUpstream(Fatal())
+
+    with pytest.raises(Fatal):
+        await caller.call(upstream)
+
+    assert upstream.calls == 1
+    assert caller.breaker.failures == 0
+
+
+async def test_timeout_is_retried():
+    caller = make_caller(timeout=0.05, retries=1)
+    upstream = FakeUpstream(1.0)
+
+    assert await caller.call(upstream) == "ok"
+    assert upstream.calls == 2
+
+
+async def test_hedges_slow_attempt():
+    caller = make_caller(timeout=1.0, retries=0, hedge=True)
+    for _ in range(caller.latency.min_samples):
+        caller.latency.record(0.01)
+
+    # The first attempt hangs; the hedge started after the p95 answers
+    upstream = FakeUpstream(10.0)
+    assert await asyncio.wait_for(caller.call(upstream), 0.5) == "ok"
+    assert upstream.calls == 2
+    assert caller.hedged == 1
+
+
+async def test_no_hedge_without_latency_history():
+    caller = make_caller(timeout=1.0, retries=0, hedge=True)
+    upstream = FakeUpstream(0.05)
+
+    assert await caller.call(upstream) == "ok"
+    assert upstream.calls == 1
+    assert caller.hedged == 0
+
+
+def make_breaker() -> CircuitBreaker:
+    return CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+
+async def test_breaker_opens_and_fails_fast():
+    caller = make_caller(retries=0, breaker=make_breaker())
+    for _ in range(2):
+        with pytest.raises(Retryable):
+            await caller.call(FakeUpstream(Retryable()))
+
+    upstream = FakeUpstream()
+    with pytest.raises(CircuitOpenError):
+        await caller.call(upstream)
+
+    assert upstream.calls == 0
+    assert caller.breaker.state == CircuitBreaker.OPEN
+    assert caller.breaker.rejected == 1
+
+
+async def open_breaker(caller: ResilientCaller) -> None:
+    for _ in range(caller.breaker.failure_threshold):
+        with pytest.raises(Retryable):
+            await caller.call(FakeUpstream(Retryable()))
+    await asyncio.sleep(caller.breaker.reset_timeout)
+
+
+async def test_successful_trial_closes_breaker():
+    caller = make_caller(retries=0, breaker=make_breaker())
+    await open_breaker(caller)
+
+    assert await caller.call(FakeUpstream()) == "ok"
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_failed_trial_reopens_breaker():
+    caller = make_caller(retries=0, breaker=make_breaker())
+    await open_breaker(caller)
+
+    with pytest.raises(Retryable):
+        await caller.call(FakeUpstream(Retryable()))
+
+    assert caller.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        await caller.call(FakeUpstream())
+
+
+async def test_fatal_error_during_trial_closes_breaker():
+    caller = make_caller(retries=0, breaker=make_breaker())
+    await open_breaker(caller)
+
+    with pytest.raises(Fatal):
+        await caller.call(FakeUpstream(Fatal()))
+
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+    assert await caller.call(FakeUpstream()) == "ok"
+
+
+async def test_cancelled_trial_is_released():
+    caller = make_caller(retries=0, breaker=make_breaker())
+    await open_breaker(caller)
+
+    trial = asyncio.ensure_future(caller.call(FakeUpstream(10.0)))
+    await asyncio.sleep(0.01)
+    assert caller.breaker.state == CircuitBreaker.HALF_OPEN
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    # The next call becomes the trial instead of being rejected forever
+    assert await caller.call(FakeUpstream()) == "ok"
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_backoff_does_not_hold_a_slot():
+    limiter = asyncio.Semaphore(1)
+    caller = make_caller(retries=1, limiter=limiter)
+    caller.backoff_base = caller.backoff_max = 10.0
+    upstream = FakeUpstream(Retryable())
+
+    call = asyncio.create_task(caller.call(upstream))
+    await asyncio.sleep(0.05)
+
+    # The first attempt failed and the retry is backing off
+    assert upstream.calls == 1
+    assert not limiter.locked()
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+
+
+async def test_hedge_takes_its_own_slot():
+    limiter = asyncio.Semaphore(2)
+    caller = make_caller(timeout=1.0, retries=0, hedge=True, limiter=limiter)
+    for _ in range(caller.latency.min_samples):
+        caller.latency.record(0.01)
+
+    upstream = FakeUpstream(10.0, 0.05)
+    call = asyncio.create_task(caller.call(upstream))
+    await asyncio.sleep(0.03)
+
+    assert caller.hedged == 1
+    assert limiter.locked()
+    assert await call == "ok"
+
+    # The abandoned first attempt gave its slot back too
+    await asyncio.sleep(0)
+    for _ in range(2):
+        await asyncio.wait_for(limiter.acquire(), 0.1)
+
+
+async def test_no_hedge_without_a_free_slot():
+    limiter = asyncio.Semaphore(1)
+    caller = make_caller(timeout=0.1, retries=0, hedge=True, limiter=limiter)
+    for _ in range(caller.latency.min_samples):
+        caller.latency.record(0.01)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await caller.call(FakeUpstream(10.0))
+
+    assert caller.hedged == 0
+
+
+async def test_waiting_for_a_slot_is_not_part_of_the_deadline():
+    limiter = asyncio.Semaphore(1)
+    caller = make_caller(timeout=0.1, retries=0, limiter=limiter)
+    upstream = FakeUpstream(0.06, 0.06)
+
+    results = await asyncio.gather(caller.call(upstream), caller.call(upstream))
+
+    assert results == ["ok", "ok"]
+    assert caller.timeouts == 0
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+import pytest
+
+from src.user_cache import CachedUserRepository
+
+pytestmark = pytest.mark.anyio
+
+
+def _matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        value = document.get(key)
+        if isinstance(condition, dict):
+            if value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeUserCollection:
+    """
+    Just enough of the `users` collection for `UserRepository`. Setting
+    `hold` makes reads wait on it after taking their snapshot, to let a
+    write land in between.
+    """
+
+    def __init__(self):
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.reads = 0
+        self.hold: Optional[asyncio.Event] = None
+
+    def _find(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        for document in self.documents.values():
+            if _matches(document, query):
+                return document
+        return None
+
+    async def find_one(
+        self, query: Dict[str, Any], projection: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        self.reads += 1
+        document = self._find(query)
+        if document is not None:
+            if projection.get("history") == 0:
+                document = {k: v for k, v in document.items() if k != "history"}
+            else:
+                document = {k: document[k] for k in ("_id", *projection)}
+            document = copy.deepcopy(document)
+
+        if self.hold is not None:
+            await self.hold.wait()
+        return document
+
+    async def insert_one(self, document: Dict[str, Any]) -> SimpleNamespace:
+        self.documents[document["_id"]] = copy.deepcopy(document)
+        return SimpleNamespace(inserted_id=document["_id"])
+
+    async def find_one_and_update(
+        self, query: Dict[str, Any], update: Dict[str, Any], **kwargs: Any
+    ) -> Optional[Dict[str, Any]]:
+        document = self._find(query)
+        if document is None:
+            return None
+
+        document.update(update.get("$set", {}))
+        for key, amount in update.get("$inc", {}).items():
+            document[key] = document.get(key, 0) + amount
+        return copy.deepcopy(document)
+
+    async def delete_one(self, query: Dict[str, Any]) -> SimpleNamespace:
+        document = self._find(query)
+        if document is not None:
+            del self.documents[document["_id"]]
+        return SimpleNamespace(deleted_count=int(document is not None))
+
+
+@pytest.fixture
+def collection() -> FakeUserCollection:
+    return FakeUserCollection()
+
+
+@pytest.fixture
+def users(collection: FakeUserCollection) -> CachedUserRepository:
+    return CachedUserRepository(collection)  # type: ignore[arg-type]
+
+
+def make_user(**fields: Any) -> Dict[str, Any]:
+    return {"_id": "u1", "email": "old@example.com", "first_name": "Ada", **fields}
+
+
+async def test_reads_are_cached_without_history(users, collection):
+    await collection.insert_one(make_user(version=2, history=[{"subject": "DSA"}]))
+
+    user = await users.find_by_id("u1")
+    assert await users.find_by_id("u1") is user
+    assert await users.find_by_email("old@example.com") is user
+    assert await users.find_version("u1") == 2
+
+    assert collection.reads == 1
+    assert "history" not in user
+    assert await users.find_by_id("u1", fields=["email"]) == {
+        "_id": "u1",
+        "email": "old@example.com",
+    }
+
+
+async def test_insert_drops_a_cached_miss(users, collection):
+    assert await users.find_by_id("u1") is None
+
+    await users.insert(make_user())
+
+    assert await users.find_by_id("u1") is not None
+
+
+async def test_modify_drops_the_cached_user(users, collection):
+    await users.insert(make_user())
+    await users.find_by_id("u1")
+
+    await users.modify("u1", {"$set": {"first_name": "Grace"}})
+
+    user = await users.find_by_id("u1")
+    assert user is not None
+    assert user["first_name"] == "Grace"
+    assert user["version"] == 1
+
+
+async def test_failed_modify_still_drops_the_cached_user(users, collection):
+    await users.insert(make_user())
+    await users.find_by_id("u1")
+
+    # A stale version matches nothing, but the cache may be what is stale
+    assert await users.modify("u1", {"$set": {"first_name": "G"}}, version=5) is None
+
+    reads = collection.reads
+    await users.find_by_id("u1")
+    assert collection.reads == reads + 1
+
+
+async def test_delete_drops_the_cached_user(users, collection):
+    await users.insert(make_user())
+    await users.find_by_id("u1")
+    await users.find_by_email("old@example.com")
+
+    await users.delete("u1")
+
+    assert await users.find_by_id("u1") is None
+    assert await users.find_by_email("old@example.com") is None
+
+
+async def test_read_racing_a_write_is_not_cached(users, collection):
+    await users.insert(make_user())
+    collection.hold = asyncio.Event()
+
+    # The read takes its snapshot, then the write lands before it returns
+    read = asyncio.create_task(users.find_by_id("u1"))
+    await asyncio.sleep(0)
+    collection.hold.set()
+    collection.hold = None
+    await users.modify("u1", {"$set": {"first_name": "Grace"}})
+
+    stale = await read
+    assert stale is not None
+    assert stale["first_name"] == "Ada"
+
+    user = await users.find_by_id("u1")
+    assert user is not None
+    assert user["first_name"] == "Grace"
+
+
+async def test_old_email_stops_resolving_after_a_change(users, collection):
+    await users.insert(make_user())
+    await users.find_by_email("old@example.com")
+
+    await users.modify("u1", {"$set": {"email": "new@example.com"}})
+    # Caches the user under its id again, while old@ still maps to that id
+    await users.find_by_id("u1")
+
+    assert await users.find_by_email("old@example.com") is None
+    user = await users.find_by_email("new@example.com")
+    assert user is not None
+    assert user["_id"] == "u1"
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from src.app import app
+from src.models import Interview
+from src.routes import user as user_routes
+from src.routes.user import ScheduledInterviewPatch, UserPatch
+
+
+@pytest.fixture
+def client() -> TestClient:
+    # Not used as a context manager, so startup hooks (Mongo, SMTP) do not run
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("field", ["first_name", "email", "password"])
+def test_user_patch_rejects_null_required_fields(field: str):
+    with pytest.raises(ValidationError):
+        UserPatch.model_validate({field: None})
+
+
+def test_user_patch_allows_null_last_name():
+    patch = UserPatch.model_validate({"last_name": None})
+    assert patch.model_dump(exclude_unset=True) == {"last_name": None}
+
+
+@pytest.mark.parametrize("field", ["subject", "topics", "duration", "date"])
+def test_scheduled_interview_patch_rejects_null_required_fields(field: str):
+    with pytest.raises(ValidationError):
+        ScheduledInterviewPatch.model_validate({field: None})
+
+
+def test_patch_user_rejects_null_over_http(client: TestClient):
+    response = client.patch("/user/some-id", json={"email": None})
+    assert response.status_code == 422
+
+
+def interview_body() -> Dict[str, Any]:
+    now = datetime(2024, 1, 1)
+    return Interview(
+        subject="Data structures", questions=[], start_date=now, end_date=now
+    ).model_dump(mode="json")
+
+
+def test_add_interview_requires_existing_user(client: TestClient, monkeypatch):
+    inserted: List[str] = []
+
+    async def modify(_id: str, update: Dict[str, Any], **kwargs) -> Optional[dict]:
+        return None
+
+    async def insert(user_id: str, interview: Interview) -> None:
+        inserted.append(user_id)
+
+    monkeypatch.setattr(user_routes.users, "modify", modify)
+    monkeypatch.setattr(user_routes.interviews, "insert", insert)
+
+    response = client.post("/user/missing/history", json=interview_body())
+
+    assert response.status_code == 404
+    assert inserted == []
+
+
+def test_add_interview_bumps_user_version(client: TestClient, monkeypatch):
+    updates: List[Dict[str, Any]] = []
+
+    async def modify(_id: str, update: Dict[str, Any], **kwargs) -> dict:
+        updates.append(update)
+        return {"_id": _id, "version": 1}
+
+    async def insert(user_id: str, interview: Interview) -> None:
+        pass
+
+    monkeypatch.setattr(user_routes.users, "modify", modify)
+    monkeypatch.setattr(user_routes.interviews, "insert", insert)
+
+    response = client.post("/user/someone/history", json=interview_body())
+
+    assert response.status_code == 200
+    assert updates == [{}]
+
+
+def stored_user() -> Dict[str, Any]:
+    return {
+        "_id": "3f6c1d2e-0000-4000-8000-000000000000",
+        "first_name": "Ada",
+        "email": "ada@example.com",
+        "password": "hash",
+        "version": 3,
+    }
+
+
+def test_raw_and_validated_fetches_use_different_etags(client: TestClient, monkeypatch):
+    async def find_by_id(_id: str, **kwargs) -> dict:
+        return stored_user()
+
+    async def find_version(_id: str) -> int:
+        return 3
+
+    monkeypatch.setattr(user_routes.users, "find_by_id", find_by_id)
+    monkeypatch.setattr(user_routes.users, "find_version", find_version)
+
+    validated = client.get("/user/fetch/someone")
+    raw = client.get("/user/fetch/someone", params={"raw": "true"})
+
+    assert validated.json()["history"] == []
+    assert "history" not in raw.json()
+    assert validated.headers["etag"] != raw.headers["etag"]
+
+    # Each tag only revalidates its own representation
+    response = client.get(
+        "/user/fetch/someone",
+        params={"raw": "true"},
+        headers={"If-None-Match": validated.headers["etag"]},
+    )
+    assert response.status_code == 200
+
+    response = client.get(
+        "/user/fetch/someone",
+        params={"raw": "true"},
+        headers={"If-None-Match": raw.headers["etag"]},
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize(
+    "method, path, body",
+    [
+        ("PATCH", "/user/someone", {"first_name": "Ada"}),
+        (
+            "POST",
+            "/user/someone/scheduled-interviews",
+            {"subject": "Graphs", "topics": [], "duration": 30, "date": "2024-01-01"},
+        ),
+        (
+            "PATCH",
+            "/user/someone/scheduled-interviews/3f6c1d2e-0000-4000-8000-000000000001",
+            {"is_completed": True},
+        ),
+    ],
+)
+def test_stale_if_match_is_rejected_with_412(
+    client: TestClient, monkeypatch, method: str, path: str, body: Dict[str, Any]
+):
+    versions: List[Optional[int]] = []
+
+    async def modify(_id: str, update: Dict[str, Any], **kwargs) -> None:
+        versions.append(kwargs.get("version"))
+        return None
+
+    async def exists(_id: str, **kwargs) -> bool:
+        return True
+
+    monkeypatch.setattr(user_routes.users, "modify", modify)
+    monkeypatch.setattr(user_routes.users, "exists", exists)
+
+    response = client.request(method, path, json=body, headers={"If-Match": '"v2"'})
+
+    assert response.status_code == 412
+    assert versions == [2]
+
+
+def test_create_user_checks_email_until_index_is_built(client: TestClient, monkeypatch):
+    inserted: List[Dict[str, Any]] = []
+
+    async def find_by_email(email: str) -> dict:
+        return stored_user()
+
+    async def insert(document: Dict[str, Any]) -> None:
+        inserted.append(document)
+
+    monkeypatch.setattr(user_routes.users, "find_by_email", find_by_email)
+    monkeypatch.setattr(user_routes.users, "insert", insert)
+
+    body = {"first_name": "Ada", "email": "ada@example.com", "password": "hash"}
+    response = client.post("/user/create", json=body)
+
+    assert response.status_code == 400
+    assert inserted == []
+
+
+def test_user_reads_render_once_per_version(client: TestClient, monkeypatch):
+    user_routes.users.clear()
+    stored = {**stored_user(), "_id": "3f6c1d2e-0000-4000-8000-0000000000aa"}
+    renders: List[int] = []
+    render = user_routes._render_user
+
+    def counting_render(user: Dict[str, Any]) -> bytes:
+        renders.append(user["version"])
+        return render(user)
+
+    async def find_by_id(_id: str, **kwargs) -> dict:
+        return stored
+
+    monkeypatch.setattr(user_routes, "_render_user", counting_render)
+    monkeypatch.setattr(user_routes.users, "find_by_id", find_by_id)
+
+    first = client.get("/user/fetch/someone")
+    second = client.get("/user/fetch/someone")
+    assert first.content == second.content
+    assert renders == [3]
+
+    stored = {**stored, "first_name": "Grace", "version": 4}
+    third = client.get("/user/fetch/someone")
+    assert third.json()["first_name"] == "Grace"
+    assert third.headers["etag"] == '"v4"'
+    assert renders == [3, 4]
+
+
+def test_full_mail_queue_does_not_throttle_the_retry(client: TestClient, monkeypatch):
+    def full(message: Any) -> None:
+        raise user_routes.MailQueueFull("full")
+
+    monkeypatch.setattr(user_routes.mail_queue, "enqueue", full)
+    params = {"email": "retry@example.com"}
+
+    assert client.post("/user/otp/generate", params=params).status_code == 503
+    assert client.post("/user/otp/generate", params=params).status_code == 503
+
+    monkeypatch.setattr(user_routes.mail_queue, "enqueue", lambda message: None)
+    assert client.post("/user/otp/generate", params=params).status_code == 200
+    assert client.post("/user/otp/generate", params=params).status_code == 429
+
+
+@pytest.mark.parametrize("fields", ["", ",", " , "])
+def test_empty_fields_are_rejected(client: TestClient, fields: str):
+    credentials = {"email": "a@example.com", "password": "secret"}
+    params = {"fields": fields}
+
+    responses = [
+        client.get("/user/fetch/some-id", params=params),
+        client.post("/user/fetch", params=params, json=credentials),
+        client.post("/user/bulk", json={"ids": ["some-id"], "fields": fields}),
+    ]
+
+    assert [response.status_code for response in responses] == [400, 400, 400]